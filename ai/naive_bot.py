@@ -1,5 +1,4 @@
 from collections import defaultdict
-import random
 
 from citadels import commands
 from citadels.cards import Character, Deck, DistrictInfo, char_by_color
@@ -9,6 +8,8 @@ from citadels import rules
 
 
 class Context:
+    __slots__ = ('builder_player', 'rich_player', 'hoarder_player', 'other_players')
+
     def __init__(self):
         self.builder_player = None
         self.rich_player = None
@@ -48,7 +49,7 @@ class NaiveBotController(PlayerController):
             if color_char in char_deck:
                 return color_char
 
-        return random.choice(char_deck)
+        return self.rng.choice(char_deck)
 
     def take_turn(self, player: Player, game: Game, sink: CommandsSink):
         command = self.decide(player, game, sink)
@@ -142,7 +143,7 @@ class NaiveBotController(PlayerController):
         if Character.Merchant in targets:
             rob.select(Character.Merchant)
         else:
-            rob.select(random.choice(targets))
+            rob.select(self.rng.choice(targets))
         return rob
 
     def destroy(self, abilities, context: Context, player: Player, game: Game):
@@ -209,7 +210,7 @@ class NaiveBotController(PlayerController):
             return kill
 
         # kill some poor random guy
-        kill.select(random.choice(possible_chars))
+        kill.select(self.rng.choice(possible_chars))
         return kill
 
     def do_tricks(self, abilities, context: Context, player: Player, game: Game):
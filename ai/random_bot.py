@@ -1,5 +1,3 @@
-import random
-
 from citadels.commands import InteractiveCommand
 from citadels.game import Deck, Game, Player
 from citadels.gameplay import CommandsSink, PlayerController
@@ -8,15 +6,15 @@ from citadels.gameplay import CommandsSink, PlayerController
 class RandomBotController(PlayerController):
     def pick_char(self, char_deck: Deck, player: Player, game: Game):
         """ Should return selected char card """
-        return random.choice(char_deck)
+        return self.rng.choice(char_deck)
 
     def take_turn(self, player: Player, game: Game, sink: CommandsSink):
         """ Should execute commands via sink """
-        command = random.choice(list(sink.all_possible_commands))
+        command = self.rng.choice(list(sink.all_possible_commands))
 
         if isinstance(command, InteractiveCommand):
             while command.choices(player, game):
-                command.select(random.choice(command.choices(player, game)))
+                command.select(self.rng.choice(command.choices(player, game)))
             assert command.ready
 
         if command:
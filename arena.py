@@ -1,5 +1,6 @@
 from argparse import ArgumentParser
 import multiprocessing
+import random
 
 from ai.naive_bot import NaiveBotController
 from ai.random_bot import RandomBotController
@@ -10,21 +11,34 @@ from citadels import rules
 
 
 bots_spec = None
+base_seed = None
 
 
-def play_some_games(num_games):
+def game_seed(seed, game_index, stream):
+    """ Seed of an independent random stream for the given game """
+    return '{}:{}:{}'.format(seed, game_index, stream)
+
+
+def play_some_games(batch):
+    first_game, num_games = batch
     try:
         game = Game(Deck(standard_chars()), Deck(simple_districts()))
         game_controller = GameController(game)
 
         bot_factory = {'R': RandomBotController, 'N': NaiveBotController}
+        bots = []
         for i, b in enumerate(bots_spec):
             bot = game.add_player('Bot{}'.format(i + 1))
-            game_controller.set_player_controller(bot, bot_factory[b]())
+            bots.append(bot_factory[b]())
+            game_controller.set_player_controller(bot, bots[-1])
 
         scores = []
         winners = []
-        for _ in range(num_games):
+        for game_index in range(first_game, first_game + num_games):
+            game.rng.seed(game_seed(base_seed, game_index, 'game'))
+            for i, bot in enumerate(bots):
+                bot.rng.seed(game_seed(base_seed, game_index, 'bot{}'.format(i + 1)))
+
             while not game_controller.game_over:
                 game_controller.play()
 
@@ -43,12 +57,23 @@ def main():
     parser = ArgumentParser()
     parser.add_argument('--games', type=int, default=10000)
     parser.add_argument('--bots', type=str, default='NRR')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--replay', type=int, default=None, help='replay single game with given index')
     args = parser.parse_args()
 
-    global bots_spec
+    global bots_spec, base_seed
     bots_spec = args.bots
+    base_seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2**32)
     num_games = args.games
 
+    if args.replay is not None:
+        scores, winners = play_some_games((args.replay, 1))
+        print('Game {game} (seed {seed}): scores {scores}, winner Bot{winner}'.format(
+            game=args.replay, seed=base_seed, scores=scores[0], winner=winners[0]))
+        return
+
+    print('Seed {}'.format(base_seed))
+
     i = 0
     winrate = [0] * len(bots_spec)
     total_margin = 0
@@ -63,7 +88,7 @@ def main():
     pool = multiprocessing.Pool(8)
     try:
         while i < num_games:
-            res = pool.map_async(play_some_games, [10]*8).get(999999999)
+            res = pool.map_async(play_some_games, [(i + k*10, 10) for k in range(8)]).get(999999999)
             if None in res:
                 break
             for scores, winners in res:
@@ -0,0 +1,187 @@
+from argparse import ArgumentParser
+import gc
+import random
+import timeit
+import tracemalloc
+
+from ai.naive_bot import NaiveBotController
+from citadels.cards import Character, Deck, simple_districts, standard_chars
+from citadels.game import Game
+from citadels.gameplay import CommandsSink, GameController
+from citadels.moves import legal_moves
+from citadels.shadow import ShadowGame, ShadowPlayer
+
+
+def report(name, seconds, number, unit='us'):
+    scale = {'us': 1e6, 'ms': 1e3}[unit]
+    print('{name}: {value:.2f} {unit} per call ({calls:.0f} calls/s)'.format(
+        name=name, value=seconds / number * scale, unit=unit, calls=number / seconds))
+
+
+def best(func, number, repeat=5):
+    """ Least total time of a few runs, less noisy than a single run """
+    return min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def allocated(factory, number):
+    """ Bytes per object kept alive, measured by tracemalloc """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory() for _ in range(number)]
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size / number
+
+
+def report_size(name, size):
+    print('{name}: {size:.0f} bytes'.format(name=name, size=size))
+
+
+def new_game(seed=1, bots='NNN'):
+    """ Game with naive bots seated, not started yet """
+    game = Game(Deck(standard_chars()), Deck(simple_districts()), rng=random.Random(seed))
+    game_controller = GameController(game)
+    for i, _ in enumerate(bots):
+        player = game.add_player('Bot{}'.format(i + 1))
+        game_controller.set_player_controller(player, NaiveBotController(rng=random.Random(seed + i)))
+    return game, game_controller
+
+
+def mid_game(seed=1, turns=4, bots='NNN'):
+    """ Game with a few turns played by naive bots, the last turn is not ended so players keep their chars """
+    game, game_controller = new_game(seed, bots)
+    game_controller.start_game()
+    for turn in range(turns):
+        if turn:
+            game_controller.end_turn()
+        game_controller.start_turn()
+        game_controller.take_turns()
+        if game_controller.game_over:
+            break
+    return game, game_controller
+
+
+def bench_clone(number):
+    game, _ = mid_game()
+    report('Game.clone', timeit.timeit(game.clone, number=number), number)
+    rng = random.Random()
+    report('Game.clone(rng)', timeit.timeit(lambda: game.clone(rng), number=number), number)
+
+
+def bench_zobrist(number):
+    game, _ = mid_game()
+    player = game.players[0]
+    report('Game.zobrist', timeit.timeit(lambda: game.zobrist, number=number), number)
+    report('ShadowGame.zobrist', timeit.timeit(lambda: ShadowGame(player, game).zobrist, number=number), number)
+
+
+def bench_events(number):
+    game, controller = mid_game()
+    player = game.players[0]
+    report('Player.cash_in + withdraw', best(lambda: (player.cash_in(1), player.withdraw(1)), number), number)
+    report('GameController.fire_event without listeners', best(lambda: controller.fire_event('player_killed', player), number), number)
+
+
+# baseline for the slots layout, bytes kept alive per object measured before and after the engine objects got __slots__
+# (later changes moved these numbers):
+#   Game.clone 6157 -> 5805, ShadowGame 1324 -> 1044, game with controller and bots 20485 -> 19943
+def bench_memory(number):
+    game, _ = mid_game()
+    player = game.players[0]
+    report_size('Game (with controller and bots)', allocated(lambda: mid_game(), min(number, 100)))
+    report_size('Game.clone', allocated(game.clone, number))
+    report_size('ShadowGame', allocated(lambda: ShadowGame(player, game), number))
+
+
+def bench_setup(number):
+    game, _ = mid_game(bots='NRR')
+    report('Game.new_game', timeit.timeit(game.new_game, number=number), number)
+    report('Game.new_turn', timeit.timeit(game.new_turn, number=number), number)
+
+
+def bench_pool(number):
+    games = max(1, number // 100)
+    game, game_controller = new_game(bots='NRR')
+    allocations = avoided = 0
+    collections = sum(stats['collections'] for stats in gc.get_stats())
+    for _ in range(games):
+        while not game_controller.game_over:
+            game_controller.play()
+        allocations += game.pool.allocated
+        avoided += game.pool.allocations_avoided
+        game_controller.end_game()
+    collections = sum(stats['collections'] for stats in gc.get_stats()) - collections
+    print('Pool: {:.0f} objects allocated, {:.0f} allocations avoided, {:.2f} gc collections per game'.format(
+        allocations / games, avoided / games, collections / games))
+
+
+def bench_shadow(number):
+    game, controller = mid_game()
+    player = game.players[0]
+    report('ShadowPlayer + ShadowGame', best(lambda: (ShadowPlayer(player, me=True), ShadowGame(player, game).players), number), number)
+    shadow_game = ShadowGame(player, game)
+
+    def changed():
+        player.cash_in(1)
+        player.withdraw(1)
+        return shadow_game.players
+
+    report('cached ShadowGame.players after a change (cash_in + withdraw)', best(changed, number), number)
+    report('cached ShadowGame.players', best(lambda: shadow_game.players, number), number)
+
+
+def bench_update(number):
+    game, _ = mid_game(turns=3)
+    game.enable_journal()
+    for char, player in zip((Character.Warlord, Character.Merchant, Character.Magician), game.players):
+        player.char = char
+        sink = CommandsSink(player, game)
+        report('CommandsSink.update ({})'.format(char.name), best(sink.update, number), number)
+        mark = game.mark()
+
+        def action():
+            sink.reset(player)
+            sink.execute(sink.possible_actions[0])  # abilities and builds are updated after the action
+            game.rollback(mark)
+
+        report('CommandsSink.reset + execute action ({})'.format(char.name), best(action, number), number)
+
+
+def bench_moves(number):
+    game, _ = mid_game(turns=3)
+    for char, player in zip((Character.Warlord, Character.Merchant, Character.Magician), game.players):
+        player.char = char
+        sink = CommandsSink(player, game)
+        sink.execute(sink.possible_actions[0])
+        moves = legal_moves(player, game, sink)
+        report('legal_moves ({}, {} moves)'.format(char.name, len(moves)), best(lambda: legal_moves(player, game, sink), number), number)
+
+
+benchmarks = {
+    'clone': bench_clone,
+    'events': bench_events,
+    'memory': bench_memory,
+    'moves': bench_moves,
+    'pool': bench_pool,
+    'setup': bench_setup,
+    'shadow': bench_shadow,
+    'update': bench_update,
+    'zobrist': bench_zobrist,
+}
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('benchmarks', nargs='*', choices=[[]] + sorted(benchmarks), default=[])
+    parser.add_argument('--number', type=int, default=10000)
+    args = parser.parse_args()
+
+    for name in args.benchmarks or sorted(benchmarks):
+        benchmarks[name](args.number)
+
+
+if __name__ == '__main__':
+    main()
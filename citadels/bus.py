@@ -0,0 +1,234 @@
+from collections import deque, namedtuple
+from enum import Enum, auto
+import logging
+import threading
+import time
+
+from citadels.event import is_noop
+
+_log = logging.getLogger(__name__)
+
+
+class Backpressure(Enum):
+    Block = auto()  # the firing thread waits for room in the buffer
+    DropOldest = auto()  # the oldest pending event is lost
+    Coalesce = auto()  # the new event replaces a pending one of the same kind, else the oldest is lost
+
+
+class LagMetrics(namedtuple('LagMetrics', ['posted', 'delivered', 'dropped', 'coalesced', 'errors', 'pending', 'lag', 'max_lag'])):
+    """ Delivery counters of a subscription, lags are in seconds: lag is the age of the oldest pending event,
+    max_lag is the longest time an event waited before delivery """
+    __slots__ = ()
+
+
+def _coalesce_key(event, args):
+    # events of the same name about the same subject (usually a player) supersede each other
+    return event, id(args[0]) if args else None
+
+
+class Subscription:
+    """ Listener of the bus with its own ring buffer, drained by a background thread or by explicit drain() calls
+
+    Exceptions of the listener are logged, the first one is raised again by the next drain(), flush() or close().
+    """
+
+    def __init__(self, listener, capacity: int, backpressure: Backpressure, clock=time.monotonic):
+        assert capacity > 0
+        self.listener = listener
+        self.backpressure = backpressure
+        self._capacity = capacity
+        self._buffer = deque(maxlen=capacity)  # (event, args, kwargs, posted at)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        self._wanted = {}  # event -> whether the listener has a real handler for it
+        self._posted = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._error = None  # first exception of the listener not raised yet
+        self._max_lag = 0.0
+
+    def wants(self, event: str):
+        wanted = self._wanted.get(event)
+        if wanted is None:
+            handler = getattr(self.listener, event, None)
+            wanted = self._wanted[event] = handler is not None and not is_noop(handler)
+        return wanted
+
+    def post(self, event: str, args, kwargs):
+        with self._cond:
+            buffer = self._buffer
+            self._posted += 1
+            if len(buffer) == self._capacity:
+                if self.backpressure is Backpressure.Block:
+                    while len(buffer) == self._capacity and not self._closed:
+                        self._cond.wait()
+                elif self.backpressure is Backpressure.Coalesce:
+                    key = _coalesce_key(event, args)
+                    for i, (pending_event, pending_args, _, posted_at) in enumerate(buffer):
+                        if _coalesce_key(pending_event, pending_args) == key:
+                            # keep the place and the time of the superseded event, the listener is that late for it
+                            buffer[i] = (event, args, kwargs, posted_at)
+                            self._coalesced += 1
+                            return
+                if len(buffer) == self._capacity:
+                    self._dropped += 1  # deque drops the oldest itself
+            buffer.append((event, args, kwargs, self._clock()))
+            self._cond.notify_all()
+
+    def drain(self):
+        """ Deliver pending events in the calling thread, returns the number delivered """
+        delivered = 0
+        while self._deliver_next(wait=False):
+            delivered += 1
+        self._raise_error()
+        return delivered
+
+    def start(self):
+        assert self._thread is None
+        self._thread = threading.Thread(target=self._run, name='EventBus-{}'.format(type(self.listener).__name__), daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout=None):
+        """ Wait until all posted events are delivered, returns False on timeout """
+        with self._cond:
+            done = self._cond.wait_for(lambda: not self._buffer and not self._busy, timeout)
+        self._raise_error()
+        return done
+
+    def close(self):
+        """ Deliver what is pending and stop the thread """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+    def metrics(self):
+        with self._cond:
+            lag = self._clock() - self._buffer[0][3] if self._buffer else 0.0
+            return LagMetrics(self._posted, self._delivered, self._dropped, self._coalesced, self._errors,
+                              len(self._buffer), lag, self._max_lag)
+
+    def _run(self):
+        while self._deliver_next(wait=True):
+            pass
+
+    def _deliver_next(self, wait):
+        with self._cond:
+            if wait:
+                self._cond.wait_for(lambda: self._buffer or self._closed)
+            if not self._buffer:
+                return False
+            event, args, kwargs, posted_at = self._buffer.popleft()
+            self._busy = True
+            self._cond.notify_all()  # room for blocked producers
+
+        try:
+            getattr(self.listener, event)(*args, **kwargs)
+        except Exception as exc:
+            _log.exception('%s failed to handle %s', type(self.listener).__name__, event)
+            error = exc
+        else:
+            error = None
+
+        with self._cond:
+            lag = self._clock() - posted_at
+            if lag > self._max_lag:
+                self._max_lag = lag
+            self._delivered += 1
+            if error is not None:
+                self._errors += 1
+                if self._error is None:
+                    self._error = error
+            self._busy = False
+            self._cond.notify_all()
+        return True
+
+    def _raise_error(self):
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+
+class EventBus:
+    """ Opt-in listener relaying events to slow listeners (loggers, statistics, spectators) off the engine's call stack
+
+    Add the bus as a listener of an event source and subscribe the slow listeners to the bus. Every subscription buffers
+    events in a bounded ring buffer and is drained on its own thread, so the game only pays for putting events into
+    buffers. Events carry the arguments as they were fired, objects like players may have changed by the time of delivery.
+    Bots are controllers, not listeners, and keep seeing the game synchronously.
+    """
+
+    def __init__(self, capacity=1024, backpressure=Backpressure.Block, clock=time.monotonic):
+        self._capacity = capacity
+        self._backpressure = backpressure
+        self._clock = clock
+        self._subscriptions = []
+
+    def subscribe(self, listener, capacity=None, backpressure=None, start=True):
+        """ Deliver events to the listener, without start only drain() delivers them (so Block would wait forever on a full buffer) """
+        subscription = Subscription(listener, capacity or self._capacity, backpressure or self._backpressure, self._clock)
+        self._subscriptions.append(subscription)
+        if start:
+            subscription.start()
+        return subscription
+
+    @property
+    def subscriptions(self):
+        return tuple(self._subscriptions)
+
+    def post(self, event: str, *args, **kwargs):
+        for subscription in self._subscriptions:
+            if subscription.wants(event):
+                subscription.post(event, args, kwargs)
+
+    def __getattr__(self, event):
+        # any event of the source is posted to the subscriptions, handlers are cached on first use
+        if event.startswith('_'):
+            raise AttributeError(event)
+
+        def handler(*args, **kwargs):
+            self.post(event, *args, **kwargs)
+
+        self.__dict__[event] = handler
+        return handler
+
+    def flush(self, timeout=None):
+        """ Wait for all subscriptions, then raise the first listener exception if any """
+        return all(_call_all([subscription.flush for subscription in self._subscriptions], timeout))
+
+    def metrics(self):
+        """ Lag metrics of the subscriptions, in the order of subscribing """
+        return [subscription.metrics() for subscription in self._subscriptions]
+
+    def close(self):
+        """ Close all subscriptions, then raise the first listener exception if any """
+        _call_all([subscription.close for subscription in self._subscriptions])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _call_all(funcs, *args):
+    """ Call every function even if some raise, then raise the first exception """
+    results = []
+    error = None
+    for func in funcs:
+        try:
+            results.append(func(*args))
+        except Exception as exc:
+            error = error or exc
+    if error is not None:
+        raise error
+    return results
@@ -1,8 +1,13 @@
+from array import array
 from collections import namedtuple
+import csv
 from enum import Enum, IntEnum, auto
 from itertools import chain
+import os
 import random
 
+from citadels import zobrist
+
 
 class Color(Enum):
     Red = auto()
@@ -12,7 +17,7 @@ class Color(Enum):
     Purple = auto()
 
 
-all_colors = (Color.Red, Color.Yellow, Color.Green, Color.Blue)  # TODO: add purple
+all_colors = (Color.Red, Color.Yellow, Color.Green, Color.Blue, Color.Purple)
 
 
 class Character(IntEnum):
@@ -79,52 +84,99 @@ class District(Enum):
     Quarry = auto()
 
 
-class DistrictInfo:
-    def __init__(self, district: District):
-        Info = namedtuple('Info', ['name', 'color', 'cost', 'mul'])
-        info = {
-            District.Watchtower: Info('Watchtower', Color.Red, 1, 3),
-            District.Prison: Info('Prison', Color.Red, 2, 3),
-            District.Battlefield: Info('Battlefield', Color.Red, 3, 3),
-            District.Fortress: Info('Fortress', Color.Red, 4, 2),
-
-            District.Tavern: Info('Tavern', Color.Green, 1, 5),
-            District.TradingPost: Info('Trading Post', Color.Green, 2, 3),
-            District.Market: Info('Market', Color.Green, 2, 4),
-            District.Docks: Info('Docks', Color.Green, 3, 3),
-            District.Harbor: Info('Harbor', Color.Green, 4, 3),
-            District.TownHall: Info('Town Hall', Color.Green, 5, 2),
-
-            District.Temple: Info('Temple', Color.Blue, 1, 3),
-            District.Church: Info('Church', Color.Blue, 2, 3),
-            District.Monastery: Info('Monastery', Color.Blue, 3, 3),
-            District.Cathedral: Info('Cathedral', Color.Blue, 5, 2),
-
-            District.Manor: Info('Manor', Color.Yellow, 3, 5),
-            District.Castle: Info('Castle', Color.Yellow, 4, 4),
-            District.Palace: Info('Palace', Color.Yellow, 5, 3),
-        }[district]
-        self.name = info.name
-        self.color = info.color
-        self.cost = info.cost
-        self.mul = info.mul
-
-
-class CharacterInfo:
-    def __init__(self, char: Character):
-        Info = namedtuple('Info', ['name', 'color'])
-        info = {
-            Character.Assassin: Info('Assassin', None),
-            Character.Thief: Info('Thief', None),
-            Character.Magician: Info('Magician', None),
-            Character.King: Info('King', Color.Yellow),
-            Character.Bishop: Info('Bishop', Color.Blue),
-            Character.Merchant: Info('Merchant', Color.Green),
-            Character.Architect: Info('Architect', None),
-            Character.Warlord: Info('Warlord', Color.Red),
-        }[char]
-        self.name = info.name
-        self.color = info.color
+class DistrictInfo(namedtuple('DistrictInfo', ['name', 'color', 'cost', 'mul'])):
+    """ Immutable district record, DistrictInfo(district) returns the shared catalog entry """
+    __slots__ = ()
+
+    def __new__(cls, district: District):
+        return _district_infos[district]
+
+    @classmethod
+    def _make_record(cls, name, color, cost, mul):
+        return tuple.__new__(cls, (name, color, cost, mul))
+
+
+class CharacterInfo(namedtuple('CharacterInfo', ['name', 'color'])):
+    """ Immutable character record, CharacterInfo(char) returns the shared catalog entry """
+    __slots__ = ()
+
+    def __new__(cls, char: Character):
+        return _char_infos[char]
+
+    @classmethod
+    def _make_record(cls, name, color):
+        return tuple.__new__(cls, (name, color))
+
+
+# district names in doc/district cards.csv which don't match District members
+_csv_aliases = {
+    'School Of Magic': District.MagicSchool,
+    'Imperial Treasury': District.Treasury,
+}
+
+
+def _load_district_infos(path):
+    """ Compile district catalog from the cards table (tab separated: name, qty, color, cost, set, ...) """
+    infos = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = csv.reader(f, delimiter='\t')
+        next(rows)
+        for name, qty, color, cost, *_ in rows:
+            district = _csv_aliases.get(name) or District[name.replace(' ', '')]
+            infos[district] = DistrictInfo._make_record(name, Color[color.capitalize()], int(cost), int(qty))
+    assert len(infos) == len(District)
+    return infos
+
+
+_district_infos = _load_district_infos(os.path.join(os.path.dirname(__file__), os.pardir, 'doc', 'district cards.csv'))
+
+_char_infos = {
+    Character.Assassin: CharacterInfo._make_record('Assassin', None),
+    Character.Thief: CharacterInfo._make_record('Thief', None),
+    Character.Magician: CharacterInfo._make_record('Magician', None),
+    Character.King: CharacterInfo._make_record('King', Color.Yellow),
+    Character.Bishop: CharacterInfo._make_record('Bishop', Color.Blue),
+    Character.Merchant: CharacterInfo._make_record('Merchant', Color.Green),
+    Character.Architect: CharacterInfo._make_record('Architect', None),
+    Character.Warlord: CharacterInfo._make_record('Warlord', Color.Red),
+}
+
+
+def _parallel_array(typecode, infos, field):
+    """ Flat array indexed by enum value, 0 for the missing entries """
+    values = [0] * (len(type(next(iter(infos)))) + 1)
+    for key, info in infos.items():
+        value = getattr(info, field)
+        values[key.value] = value.value if isinstance(value, Color) else (value or 0)
+    return array(typecode, values)
+
+
+# parallel arrays indexed by District.value/Character.value, colors are stored as Color.value (0 for colorless)
+district_costs = _parallel_array('B', _district_infos, 'cost')
+district_colors = _parallel_array('B', _district_infos, 'color')
+district_muls = _parallel_array('B', _district_infos, 'mul')
+char_colors = _parallel_array('B', _char_infos, 'color')
+
+
+def district_bit(district):
+    """ Bit of the district in a city mask """
+    return 1 << district._value_  # plain attribute, cheaper than the value property
+
+
+def districts_mask(districts):
+    """ Mask of the districts, duplicates are merged """
+    mask = 0
+    for district in districts:
+        mask |= 1 << district.value
+    return mask
+
+
+# masks of all the districts of a color indexed by Color.value, 0 for colorless
+color_masks = [0] * (len(Color) + 1)
+for _district in District:
+    color_masks[district_colors[_district.value]] |= 1 << _district.value
+color_masks[0] = 0
+del _district
 
 
 def standard_chars():
@@ -170,42 +222,450 @@ class Card:
         return 'None' if self._locked else str(self._payload)
 
 
+class HiddenCard:
+    """ Facedown card without payload, all hidden cards of the same kind are one shared object """
+
+    __slots__ = ('_attrs',)
+
+    def __init__(self, kind):
+        self._attrs = frozenset(dir(next(iter(kind))))
+
+    def __getattr__(self, item):
+        if item not in self._attrs:
+            raise AttributeError(f'unknown attr {item}')
+        return None
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'None'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+facedown_district = HiddenCard(District)
+facedown_char = HiddenCard(Character)
+
+
+_FREE_SLOT = object()
+
+DeckSnapshot = namedtuple('DeckSnapshot', ['head', 'tail', 'generation'])
+
+
 class Deck:
-    def __init__(self, cards):
-        self._cards = list(cards)
+    """ Deck of cards with O(1) operations at both ends
+
+    Cards live in the [head, tail) window of a slot list: taking from the top only moves the head cursor,
+    so taken cards stay in their slots and a snapshot (head, tail, generation) can rewind them.
+    Any operation that overwrites or reorders slots bumps the generation and invalidates older snapshots.
+    """
 
-    def shuffle(self):
-        random.shuffle(self._cards)
+    _free_slot = _FREE_SLOT
+    _journal = None
+
+    def __init__(self, cards):
+        self._generation = 0
+        self._reset(self._new_slots(cards))
+
+    @staticmethod
+    def _new_slots(cards):
+        return list(cards)
+
+    def clone(self):
+        """ Copy of the deck holding only the remaining cards """
+        deck = self.__class__.__new__(self.__class__)
+        deck.__dict__.update(self.__dict__)
+        deck._journal = None  # the clone is detached from the original's journal
+        deck._generation = 0
+        deck._reset(self._slots[self._head:self._tail])
+        return deck
+
+    def _reset(self, slots):
+        self._slots = slots
+        self._head = 0
+        self._tail = len(slots)
+        self._front = 0  # number of slots prepended so far, keeps snapshots valid when growing to the top
+        self._generation += 1
+
+    def shuffle(self, rng=random):
+        cards = self._slots[self._head:self._tail]
+        rng.shuffle(cards)
+        if self._journal:
+            self._journal.record(self._set_state, self._slots, self._head, self._tail, self._front, self._generation)
+        self._reset(cards)
+
+    def refill(self, cards):
+        """ Replace all the cards in place, earlier snapshots become stale """
+        if self._journal:
+            self._journal.record(self._set_state, self._slots, self._head, self._tail, self._front, self._generation)
+        self._reset(self._new_slots(cards))
+
+    def _set_state(self, slots, head, tail, front, generation):
+        self._slots = slots
+        self._head = head
+        self._tail = tail
+        self._front = front
+        self._generation = generation
 
     @property
     def empty(self):
-        return bool(self._cards)
+        return self._tail != self._head
 
     def take_from_top(self):
-        return self._cards.pop(0)
+        if self._head == self._tail:
+            raise IndexError('take from empty deck')
+        card = self._slots[self._head]
+        self._head += 1
+        if self._journal:
+            self._journal.record(self._undo_take_from_top)
+        return card
+
+    def _undo_take_from_top(self):
+        self._head -= 1
 
     def put_on_bottom(self, card):
-        self._cards.append(card)
+        slots = self._slots
+        if self._tail < len(slots):
+            if self._journal:
+                self._journal.record(self._undo_put_on_bottom, slots[self._tail], self._generation)
+            if slots[self._tail] != card:
+                self._generation += 1
+            slots[self._tail] = card
+        else:
+            if self._head > 64 and self._head > self._tail - self._head:
+                self._compact()
+            if self._journal:
+                self._journal.record(self._undo_put_on_bottom, self._free_slot, self._generation)
+            slots.append(card)
+        self._tail += 1
+
+    def _undo_put_on_bottom(self, slot, generation):
+        self._tail -= 1
+        self._slots[self._tail] = slot
+        self._generation = generation
 
     def put_on_top(self, card):
-        self._cards.insert(0, card)
+        if self._head == 0:
+            self._grow_front()
+        self._head -= 1
+        slot = self._slots[self._head]
+        if self._journal:
+            self._journal.record(self._undo_put_on_top, slot, self._generation)
+        if slot is not self._free_slot and slot != card:
+            self._generation += 1
+        self._slots[self._head] = card
+
+    def _undo_put_on_top(self, slot, generation):
+        self._slots[self._head] = slot
+        self._head += 1
+        self._generation = generation
+
+    def _grow_front(self):
+        extra = max(self._tail - self._head, 8)
+        self._slots[:0] = self._new_slots([self._free_slot] * extra)
+        self._head += extra
+        self._tail += extra
+        self._front += extra
+
+    def _compact(self):
+        if self._journal:
+            self._journal.record(self._set_state, self._slots[:], self._head, self._tail, self._front, self._generation)
+        del self._slots[:self._head]
+        self._tail -= self._head
+        self._head = 0
+        self._front = 0
+        self._generation += 1
+
+    def _remove_at(self, index):
+        """ Remove card at given physical slot keeping the order of the rest """
+        slots = self._slots
+        card = slots[index]
+        if self._journal:
+            self._journal.record(self._undo_remove_at, slots[self._head:index + 1], self._generation)
+        if index != self._head:
+            slots[self._head + 1:index + 1] = slots[self._head:index]
+            self._generation += 1
+        self._head += 1
+        return card
+
+    def _undo_remove_at(self, slots, generation):
+        self._head -= 1
+        self._slots[self._head:self._head + len(slots)] = slots
+        self._generation = generation
 
     @property
     def cards(self):
-        return tuple(self._cards)
+        return tuple(self._slots[self._head:self._tail])
 
-    def take_random(self):
-        return self._cards.pop(random.randint(0, len(self._cards)-1))
+    def take_random(self, rng=random):
+        return self._remove_at(self._head + rng.randint(0, self._tail - self._head - 1))
 
     def take(self, card):
-        self._cards.remove(card)
+        self._remove_at(self._slots.index(card, self._head, self._tail))
         return card
 
+    def snapshot(self):
+        """ Cheap deck state marker to be passed to restore() """
+        return DeckSnapshot(self._head - self._front, self._tail - self._front, self._generation)
+
+    def restore(self, snapshot: DeckSnapshot):
+        """ Rewind the deck to the snapshot, valid while no slots were overwritten since it was taken """
+        if snapshot.generation != self._generation:
+            raise ValueError('deck snapshot is stale')
+        if self._journal:
+            # relative to the front like snapshots, _grow_front() may shift the slots before the rollback
+            self._journal.record(self._set_cursors, self._head - self._front, self._tail - self._front)
+        self._head = snapshot.head + self._front
+        self._tail = snapshot.tail + self._front
+
+    def _set_cursors(self, head, tail):
+        self._head = head + self._front
+        self._tail = tail + self._front
+
     def __len__(self):
-        return len(self._cards)
+        return self._tail - self._head
 
     def __iter__(self):
-        return iter(self._cards)
+        return iter(self._slots[self._head:self._tail])
 
     def __getitem__(self, item):
-        return self._cards[item]
+        if isinstance(item, slice):
+            return self._slots[self._head:self._tail][item]
+        size = self._tail - self._head
+        if item < 0:
+            item += size
+        if not 0 <= item < size:
+            raise IndexError('deck index out of range')
+        return self._slots[self._head + item]
+
+
+_district_by_value = [None] * (len(District) + 1)
+for _district in District:
+    _district_by_value[_district.value] = _district
+_district_by_value = tuple(_district_by_value)
+
+
+class DistrictDeck(Deck):
+    """ Deck of districts coded as District.value bytes with running composition counters
+
+    Counters are updated on every take and put, so composition queries are O(1).
+    """
+
+    _free_slot = 0
+
+    def __init__(self, districts=()):
+        self._counts = array('H', bytes(2 * (len(District) + 1)))
+        self._color_counts = array('H', bytes(2 * (len(Color) + 1)))
+        self._total_cost = 0
+        self._hash = 0
+        super().__init__(district.value for district in districts)
+        self._recount()
+
+    @staticmethod
+    def _new_slots(values):
+        return array('B', values)
+
+    def clone(self):
+        deck = super().clone()
+        deck._counts = array('H', self._counts)
+        deck._color_counts = array('H', self._color_counts)
+        return deck
+
+    def _recount(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        for i in range(len(self._color_counts)):
+            self._color_counts[i] = 0
+        self._total_cost = 0
+        self._hash = 0
+        for value in self._slots[self._head:self._tail]:
+            self._added(value)
+
+    def _added(self, value):
+        self._counts[value] += 1
+        self._color_counts[district_colors[value]] += 1
+        self._total_cost += district_costs[value]
+        self._hash += zobrist.deck_keys[value]
+
+    def _removed(self, value):
+        self._counts[value] -= 1
+        self._color_counts[district_colors[value]] -= 1
+        self._total_cost -= district_costs[value]
+        self._hash -= zobrist.deck_keys[value]
+
+    def take_from_top(self):
+        value = super().take_from_top()
+        self._removed(value)
+        if self._journal:
+            self._journal.record(self._added, value)
+        return _district_by_value[value]
+
+    def put_on_bottom(self, district: District):
+        super().put_on_bottom(district.value)
+        self._added(district.value)
+        if self._journal:
+            self._journal.record(self._removed, district.value)
+
+    def put_on_top(self, district: District):
+        super().put_on_top(district.value)
+        self._added(district.value)
+        if self._journal:
+            self._journal.record(self._removed, district.value)
+
+    @property
+    def cards(self):
+        return tuple(map(_district_by_value.__getitem__, self._slots[self._head:self._tail]))
+
+    def take_random(self, rng=random):
+        value = super().take_random(rng)
+        self._removed(value)
+        if self._journal:
+            self._journal.record(self._added, value)
+        return _district_by_value[value]
+
+    def take(self, district: District):
+        super().take(district.value)
+        self._removed(district.value)
+        if self._journal:
+            self._journal.record(self._added, district.value)
+        return district
+
+    def refill(self, districts):
+        """ Replace all the cards in place, copying slots and counters when refilled from another DistrictDeck """
+        if self._journal:
+            self._journal.record(self._recount)  # runs after the slots are rolled back
+        if not isinstance(districts, DistrictDeck):
+            super().refill(district.value for district in districts)
+            self._recount()
+            return
+        super().refill(districts._slots[districts._head:districts._tail])
+        self._counts[:] = districts._counts
+        self._color_counts[:] = districts._color_counts
+        self._total_cost = districts._total_cost
+        self._hash = districts._hash
+
+    def restore(self, snapshot: DeckSnapshot):
+        head, tail = self._head, self._tail
+        if self._journal:
+            self._journal.record(self._recount)  # runs after the cursors are rolled back
+        super().restore(snapshot)
+        if self._head >= tail or head >= self._tail:
+            self._recount()
+            return
+        slots = self._slots
+        for value in slots[self._head:head]:
+            self._added(value)
+        for value in slots[head:self._head]:
+            self._removed(value)
+        for value in slots[tail:self._tail]:
+            self._added(value)
+        for value in slots[self._tail:tail]:
+            self._removed(value)
+
+    def __iter__(self):
+        return map(_district_by_value.__getitem__, self._slots[self._head:self._tail])
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(map(_district_by_value.__getitem__, super().__getitem__(item)))
+        return _district_by_value[super().__getitem__(item)]
+
+    def copies(self, district: District):
+        """ Number of copies of the district left in the deck """
+        return self._counts[district.value]
+
+    def copies_of_color(self, color: Color):
+        """ Number of districts of the color left in the deck """
+        return self._color_counts[color.value]
+
+    def probability_of_color(self, color: Color):
+        """ Probability that the next card is of the color """
+        size = self._tail - self._head
+        return self._color_counts[color.value] / size if size else 0.0
+
+    @property
+    def zobrist(self):
+        """ Hash of the deck composition, order is not taken into account """
+        return self._hash & zobrist.MASK
+
+    @property
+    def expected_cost(self):
+        """ Expected cost of the next card """
+        size = self._tail - self._head
+        return self._total_cost / size if size else 0.0
+
+
+class CharacterDeck(Deck):
+    """ Deck of characters with a running hash of its composition
+
+    The hash tells apart states that differ only in which characters were discarded facedown.
+    """
+
+    def __init__(self, chars=()):
+        self._hash = 0
+        super().__init__(chars)
+        self._rehash()
+
+    def _rehash(self):
+        self._hash = sum(zobrist.char_deck_keys[char] for char in self._slots[self._head:self._tail])
+
+    def _added(self, char):
+        self._hash += zobrist.char_deck_keys[char]
+
+    def _removed(self, char):
+        self._hash -= zobrist.char_deck_keys[char]
+
+    def take_from_top(self):
+        char = super().take_from_top()
+        self._removed(char)
+        if self._journal:
+            self._journal.record(self._added, char)
+        return char
+
+    def put_on_bottom(self, char: Character):
+        super().put_on_bottom(char)
+        self._added(char)
+        if self._journal:
+            self._journal.record(self._removed, char)
+
+    def put_on_top(self, char: Character):
+        super().put_on_top(char)
+        self._added(char)
+        if self._journal:
+            self._journal.record(self._removed, char)
+
+    def take_random(self, rng=random):
+        char = super().take_random(rng)
+        self._removed(char)
+        if self._journal:
+            self._journal.record(self._added, char)
+        return char
+
+    def take(self, char: Character):
+        super().take(char)
+        self._removed(char)
+        if self._journal:
+            self._journal.record(self._added, char)
+        return char
+
+    def refill(self, chars):
+        if self._journal:
+            self._journal.record(self._rehash)  # runs after the slots are rolled back
+        super().refill(chars)
+        self._rehash()
+
+    def restore(self, snapshot: DeckSnapshot):
+        if self._journal:
+            self._journal.record(self._rehash)  # runs after the cursors are rolled back
+        super().restore(snapshot)
+        self._rehash()
+
+    @property
+    def zobrist(self):
+        """ Hash of the deck composition, order is not taken into account """
+        return self._hash & zobrist.MASK
@@ -1,8 +1,9 @@
 from enum import IntFlag, auto
+from itertools import chain, combinations
 
 from citadels.cards import Character, all_chars
 from citadels.event import EventTransaction
-from citadels.game import Game, Player
+from citadels.game import Game, GameError, Player
 from citadels import rules
 
 
@@ -12,10 +13,34 @@ class Restriction(IntFlag):
     OnAfterAction = auto()
     Compulsory = auto()
 
+    # restrictions are only tested for truth, so plain int masking is enough and skips Flag's slow __and__
+    __and__ = int.__and__
+    __rand__ = int.__rand__
+
 
 class Command:
+    """ Commands issued by CommandsSink are valid until the sink drops them: an update replaces them or the sink is reset
+
+    Dropped commands go back to the game's pool to be issued again, using them before that raises GameError.
+    """
+
+    __slots__ = ('restriction', 'specifier', '_released')  # specifier is assigned by CommandsSink
+
     def __init__(self, restriction=0):
         self.restriction = restriction
+        self._released = False
+
+    def release(self):
+        """ Mark the command as given back to the pool """
+        self._released = True
+
+    @property
+    def released(self):
+        return self._released
+
+    def _check_issued(self):
+        if self._released:
+            raise GameError('command {} was dropped by the sink'.format(self))
 
     def apply(self, player: Player, game: Game):
         raise NotImplementedError()
@@ -26,15 +51,30 @@ class Command:
 
 
 class InteractiveCommand(Command):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
     def choices(self, player: Player, game: Game):
         raise NotImplementedError()
 
+    def has_choices(self, player: Player, game: Game):
+        """ Same as bool(choices()), commands override it when the check can stop at the first choice """
+        return bool(self.choices(player, game))
+
+    def choice_sequences(self, player: Player, game: Game):
+        """ Distinct sequences of choices making the command ready, enumerated without touching the command or the game """
+        raise NotImplementedError()
+
     def select(self, choice):
         raise NotImplementedError()
 
+    @property
+    def selected(self):
+        """ Choices selected so far, in the order of selection """
+        raise NotImplementedError()
+
     def apply(self, player: Player, game: Game):
         raise NotImplementedError()
 
@@ -52,12 +92,15 @@ class InteractiveCommand(Command):
 
 
 class CashIn(Command):
+    __slots__ = ('_amount', '_source')
+
     def __init__(self, amount, source=None, **kwargs):
         super().__init__(**kwargs)
         self._amount = amount
         self._source = source
 
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         player.cash_in(self._amount, self._source)
 
     def __repr__(self):
@@ -75,11 +118,14 @@ class CashIn(Command):
 
 
 class DrawCards(Command):
+    __slots__ = ('_draw',)
+
     def __init__(self, amount, **kwargs):
         super().__init__(**kwargs)
         self._draw = amount
 
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         for _ in range(self._draw):
             if not game.districts:
                 break
@@ -97,35 +143,64 @@ class DrawCards(Command):
 
 
 class DrawSomeCards(InteractiveCommand):
-    def __init__(self, draw=2, keep=1, **kwargs):
+    __slots__ = ('_draw', '_keep', '_deck', '_deck_snapshot', '_cards_taken', '_kept', '_cancelled')
+
+    def __init__(self, draw=2, keep=1, deck=None, **kwargs):
         super().__init__(**kwargs)
         self._draw = draw
         self._keep = keep
+        self._deck = deck  # bots see a shadow game, so the sink gives the real deck to draw from
         assert 0 < self._keep <= self._draw
-        self._orig_card_taken = []
+        self._deck_snapshot = None
         self._cards_taken = []
-        self._cards_to_keep = []
+        self._kept = []  # positions in _cards_taken, in the order of selection
+        self._cancelled = False
 
     def choices(self, player: Player, game: Game):
-        if not self._cards_taken:
-            self._cards_taken = [game.districts.take_from_top() for _ in range(self._draw)]
-            self._orig_card_taken = tuple(self._cards_taken)
-        if len(self._cards_to_keep) < self._keep:
-            return self._cards_taken
+        self._check_issued()
+        if self._cancelled:
+            return []
+        if self._deck_snapshot is None:
+            deck = self._deck if self._deck is not None else game.districts
+            self._deck_snapshot = deck.snapshot()
+            self._cards_taken = [deck.take_from_top() for _ in range(self._draw)]
+        if len(self._kept) < self._keep:
+            return [card for i, card in enumerate(self._cards_taken) if i not in self._kept]
         else:
             return []
 
+    def choice_sequences(self, player: Player, game: Game):
+        assert self._deck_snapshot is None
+        # cards are chosen by position, so the choices are the same whether the deck is shadowed or not
+        return list(combinations(range(min(self._draw, len(game.districts))), self._keep))
+
     def select(self, choice):
-        assert choice in self._cards_taken
-        self._cards_taken.remove(choice)
-        self._cards_to_keep.append(choice)
+        position = next((i for i, card in enumerate(self._cards_taken) if card == choice and i not in self._kept), None)
+        assert position is not None
+        self._kept.append(position)
+
+    def select_at(self, position: int):
+        """ Keep the card at the position among the drawn ones """
+        assert 0 <= position < len(self._cards_taken) and position not in self._kept
+        self._kept.append(position)
+
+    @property
+    def selected(self):
+        return tuple(self._cards_taken[i] for i in self._kept)
+
+    @property
+    def selected_positions(self):
+        """ Positions of the kept cards among the drawn ones, in the order of choice_sequences() """
+        return tuple(sorted(self._kept))
 
     def apply(self, player: Player, game: Game):
-        assert self._cards_to_keep
-        for card in self._cards_to_keep:
-            player.take_card(card)
-        for card in self._cards_taken:
-            game.districts.put_on_bottom(card)
+        self._check_issued()
+        assert self._kept
+        for i in self._kept:
+            player.take_card(self._cards_taken[i])
+        for i, card in enumerate(self._cards_taken):
+            if i not in self._kept:
+                game.districts.put_on_bottom(card)
 
     def __repr__(self):
         return 'DrawSomeCards(draw={draw}, keep={keep})'.format(draw=self._draw, keep=self._keep)
@@ -139,29 +214,44 @@ class DrawSomeCards(InteractiveCommand):
 
     @property
     def ready(self):
-        return len(self._cards_to_keep) == self._keep
+        return len(self._kept) == self._keep
 
     def cancel(self, player: Player, game: Game):
-        # TODO: mm... rollback a transaction?
-        for card in reversed(self._orig_card_taken):
-            game.districts.put_on_top(card)
+        # a cancelled command draws no more, sink.update() issues a fresh one
+        if self._deck_snapshot is not None:
+            (self._deck if self._deck is not None else game.districts).restore(self._deck_snapshot)
+        self._deck_snapshot = None
+        self._cards_taken = []
+        self._kept = []
+        self._cancelled = True
 
 
 class Kill(InteractiveCommand):
+    __slots__ = ('_char',)
+
     def __init__(self, char=None, **kwargs):
         super().__init__(**kwargs)
         self._char = char
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         if self._char:
             return []
         else:
             return [char for char in all_chars if char != Character.Assassin and char not in game.turn.unused_chars]
 
+    def choice_sequences(self, player: Player, game: Game):
+        return [(char,) for char in self.choices(player, game)]
+
     def select(self, choice):
         self._char = choice
 
+    @property
+    def selected(self):
+        return (self._char,) if self._char else ()
+
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         assert self._char
         assert not game.turn.killed_char
         game.turn.killed_char = self._char
@@ -182,21 +272,32 @@ class Kill(InteractiveCommand):
 
 
 class Rob(InteractiveCommand):
+    __slots__ = ('_char',)
+
     def __init__(self, char=None, **kwargs):
         super().__init__(**kwargs)
         self._char = char
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         if self._char:
             return []
         else:
             cant_rob = [Character.Thief, Character.Assassin, game.turn.killed_char] + list(game.turn.unused_chars)
             return [char for char in all_chars if char not in cant_rob]
 
+    def choice_sequences(self, player: Player, game: Game):
+        return [(char,) for char in self.choices(player, game)]
+
     def select(self, choice):
         self._char = choice
 
+    @property
+    def selected(self):
+        return (self._char,) if self._char else ()
+
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         assert self._char
         assert not game.turn.robbed_char
         game.turn.robbed_char = self._char
@@ -217,17 +318,28 @@ class Rob(InteractiveCommand):
 
 
 class SwapHands(InteractiveCommand):
+    __slots__ = ('_target',)
+
     def __init__(self, target=None, **kwargs):
         super().__init__(**kwargs)
         self._target = target
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         return [p for p in game.players if p.player_id != player.player_id] if not self._target else []
 
+    def choice_sequences(self, player: Player, game: Game):
+        return [(p,) for p in self.choices(player, game)]
+
     def select(self, choice):
         self._target = choice
 
+    @property
+    def selected(self):
+        return (self._target,) if self._target else ()
+
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         assert self._target
         player1 = game.players.find_by_id(player.player_id)
         player2 = game.players.find_by_id(self._target.player_id)
@@ -257,20 +369,33 @@ class SwapHands(InteractiveCommand):
 
 
 class ReplaceHand(InteractiveCommand):
+    __slots__ = ('_cards',)
+
     def __init__(self, cards=None, **kwargs):
         super().__init__(**kwargs)
         self._cards = cards or []
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         cards = list(player.hand)
         for card in self._cards:
             cards.remove(card)
         return cards
 
+    def choice_sequences(self, player: Player, game: Game):
+        assert not self._cards
+        hand = player.hand
+        return list(dict.fromkeys(chain.from_iterable(combinations(hand, n) for n in range(1, len(hand) + 1))))
+
     def select(self, choice):
         self._cards.append(choice)
 
+    @property
+    def selected(self):
+        return tuple(self._cards)
+
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         with EventTransaction(player, 'replaced_hand', player, len(self._cards)):
             for card in self._cards:
                 player.remove_card(card)
@@ -293,15 +418,28 @@ class ReplaceHand(InteractiveCommand):
 
 
 class Destroy(InteractiveCommand):
+    __slots__ = ('_target', '_card')
+
     def __init__(self, target=None, card=None, **kwargs):
         super().__init__(**kwargs)
         self._target = target
         self._card = card
 
     def _possible_districts(self, victim: Player, destroyer: Player):
-        return [d for d in victim.city if rules.can_be_destroyed(d, victim) and rules.how_much_cost_to_destroy(d, destroyer) <= destroyer.gold]
+        return list(self._destroyable(victim, destroyer))
+
+    def _destroyable(self, victim: Player, destroyer: Player):
+        gold = destroyer.gold
+        return (d for d in victim.city if rules.can_be_destroyed(d, victim) and rules.how_much_cost_to_destroy(d, victim) <= gold)
+
+    def has_choices(self, player: Player, game: Game):
+        if self._target:
+            return super().has_choices(player, game)
+        # WARLORD-SPARE-COMPLETE, WARLORD-DESTROY-OWN
+        return any(not rules.is_city_complete(p) and any(True for _ in self._destroyable(p, player)) for p in game.players)
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         if not self._target:
             return [p for p in game.players if not rules.is_city_complete(p) and self._possible_districts(p, player)]  # WARLORD-SPARE-COMPLETE, WARLORD-DESTROY-OWN
 
@@ -310,13 +448,23 @@ class Destroy(InteractiveCommand):
 
         return []
 
+    def choice_sequences(self, player: Player, game: Game):
+        assert not self._target
+        # WARLORD-SPARE-COMPLETE, WARLORD-DESTROY-OWN
+        return [(p, d) for p in game.players if not rules.is_city_complete(p) for d in dict.fromkeys(self._destroyable(p, player))]
+
     def select(self, choice):
         if not self._target:
             self._target = choice
         elif not self._card:
             self._card = choice
 
+    @property
+    def selected(self):
+        return tuple(choice for choice in (self._target, self._card) if choice)
+
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         target = game.players.find_by_id(self._target.player_id)
         assert not rules.is_city_complete(target)
         target.destroy_district(self._card)
@@ -341,11 +489,14 @@ class Destroy(InteractiveCommand):
 
 
 class Build(InteractiveCommand):
+    __slots__ = ('_district',)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._district = None
 
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         assert self._district
         with EventTransaction(player, 'district_built', player, self._district):
             cost = rules.how_much_cost_to_build(self._district, player)
@@ -360,6 +511,7 @@ class Build(InteractiveCommand):
         return isinstance(other, Build) and self._district == other._district
 
     def choices(self, player: Player, game: Game):
+        self._check_issued()
         if self._district:
             return []
 
@@ -370,10 +522,24 @@ class Build(InteractiveCommand):
                     r.append(district)
         return r
 
+    def has_choices(self, player: Player, game: Game):
+        if self._district:
+            return False
+        gold = player.gold
+        return any(rules.can_be_built(district, player) and rules.how_much_cost_to_build(district, player) <= gold
+                   for district in player.hand)
+
+    def choice_sequences(self, player: Player, game: Game):
+        return [(district,) for district in dict.fromkeys(self.choices(player, game))]
+
     def select(self, choice):
         assert not self._district
         self._district = choice
 
+    @property
+    def selected(self):
+        return (self._district,) if self._district else ()
+
     @property
     def help(self):
         return 'Build district'
@@ -384,10 +550,13 @@ class Build(InteractiveCommand):
 
 
 class TakeCrown(Command):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
     def apply(self, player: Player, game: Game):
+        self._check_issued()
         assert player in game.players
         game.crowned_player = player
 
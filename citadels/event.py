@@ -1,15 +1,97 @@
+def noop(handler):
+    """ Marks a do-nothing default handler of a listener base class, event sources skip it """
+    handler.noop = True
+    return handler
+
+
+def is_noop(handler):
+    """ Whether the bound handler is a noop default """
+    return getattr(getattr(handler, '__func__', None), 'noop', False)
+
+
+class _SingleEventBatch:
+    """ Handler delivering an event fired outside of transactions to a batched listener as a batch of one """
+
+    __slots__ = ('_event_batch', '_event')
+
+    def __init__(self, listener, event: str):
+        self._event_batch = listener.event_batch
+        self._event = event
+
+    def __call__(self, *args, **kwargs):
+        self._event_batch(((self._event, args, kwargs),))
+
+
 class EventSource:
+    __slots__ = ('_listeners', '_mute_count', '_handlers', '_batched', '_queue')
+
     def __init__(self):
         self._listeners = []
         self._mute_count = 0
+        self._handlers = {}  # event -> bound handlers worth calling, resolved on first fire
+        self._batched = set()  # ids of batched listeners
+        self._queue = None  # events of the open transactions, kept only when there are batched listeners
 
-    def add_listener(self, listener):
+    def add_listener(self, listener, batched=False):
+        """ Batched listeners get events as event_batch(events) calls of (event, args, kwargs) tuples:
+        all events of a committed transaction in one call, ending with its summary event """
         self._listeners.append(listener)
+        if batched:
+            self._batched.add(id(listener))
+        self._handlers.clear()
 
     def fire_event(self, event: str, *args, **kwargs):
-        if not self.muted:
-            for listener in self._listeners:
-                getattr(listener, event)(*args, **kwargs)
+        if self._mute_count:
+            if self._queue is not None:
+                self._queue.append((event, args, kwargs))
+            return
+        handlers = self._handlers.get(event)
+        if handlers is None:
+            handlers = self._handlers[event] = self._resolve(event)
+        for handler in handlers:
+            handler(*args, **kwargs)
+
+    def _resolve(self, event: str, batched=True):
+        handlers = []
+        for listener in self._listeners:
+            if id(listener) in self._batched:
+                if batched:
+                    handlers.append(_SingleEventBatch(listener, event))
+                continue
+            handler = getattr(listener, event)
+            if not is_noop(handler):
+                handlers.append(handler)
+        return tuple(handlers)
+
+    def begin_transaction(self):
+        """ Mute the source, returns the mark to roll back to """
+        if self._queue is None and self._batched:
+            self._queue = []
+        self._mute_count += 1
+        return len(self._queue) if self._queue is not None else 0
+
+    def commit_transaction(self, event: str, *args, **kwargs):
+        """ Close the transaction firing its summary event, inside another transaction the summary is queued there """
+        self._mute_count -= 1
+        queue = self._queue
+        if self._mute_count or queue is None:
+            self.fire_event(event, *args, **kwargs)
+            return
+        self._queue = None
+        queue.append((event, args, kwargs))
+        for handler in self._resolve(event, batched=False):
+            handler(*args, **kwargs)
+        for listener in self._listeners:
+            if id(listener) in self._batched:
+                listener.event_batch(queue)
+
+    def rollback_transaction(self, mark: int):
+        """ Close the transaction discarding its events """
+        self._mute_count -= 1
+        if self._queue is not None:
+            del self._queue[mark:]
+            if not self._mute_count:
+                self._queue = None
 
     def mute(self):
         self._mute_count += 1
@@ -23,14 +105,20 @@ class EventSource:
 
 
 class EventTransaction:
+    """ Events fired by the source inside the transaction are replaced by one summary event for ordinary listeners,
+    batched listeners get them all in order with the summary; nothing is delivered if the block raises """
+
     def __init__(self, event_source: EventSource, *args, **kwargs):
         self._event_source = event_source
         self._args = args
         self._kwargs = kwargs
+        self._mark = 0
 
     def __enter__(self):
-        self._event_source.mute()
+        self._mark = self._event_source.begin_transaction()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._event_source.unmute()
-        self._event_source.fire_event(*self._args, **self._kwargs)
+        if exc_type is None:
+            self._event_source.commit_transaction(*self._args, **self._kwargs)
+        else:
+            self._event_source.rollback_transaction(self._mark)
@@ -1,8 +1,11 @@
-from collections import defaultdict
-from copy import deepcopy
+from array import array
+import random
 
-from citadels.cards import Character, Deck, District
-from citadels.event import EventSource
+from citadels.cards import Character, CharacterDeck, Deck, District, DistrictDeck, all_colors, color_masks, district_colors, district_costs, districts_mask
+from citadels.event import EventSource, noop
+from citadels.journal import Journal
+from citadels.pool import Pool
+from citadels import zobrist
 
 
 class GameError(RuntimeError):
@@ -11,66 +14,166 @@ class GameError(RuntimeError):
 
 
 class Bank:
+    """ Gold storage keeping all balances in a single array, one slot per account key """
+
+    __slots__ = ('_slots', '_balances', '_accounts', '_journal')
+
     def __init__(self):
-        self._accounts = defaultdict(lambda: BankAccount(self))
+        self._slots = {}
+        self._balances = array('i')
+        self._accounts = {}
+        self._journal = None
 
     def account(self, key):
         """ Player's account """
-        return self._accounts[key]
+        account = self._accounts.get(key)
+        if account is None:
+            account = self._accounts[key] = BankAccount(self, self._slot(key))
+        return account
+
+    def _slot(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self._balances)
+            self._balances.append(0)
+        return slot
+
+    def balance(self, key):
+        """ Balance of the account, zero for unknown accounts """
+        slot = self._slots.get(key)
+        return self._balances[slot] if slot is not None else 0
+
+    def balances(self):
+        """ Balances of all accounts by key """
+        balances = self._balances
+        return {key: balances[slot] for key, slot in self._slots.items()}
+
+    def richest(self):
+        """ Key of the account with the biggest balance, first opened wins on ties """
+        if not self._balances:
+            return None
+        balances = self._balances
+        return max(self._slots, key=lambda key: balances[self._slots[key]])
+
+    def snapshot(self):
+        """ Copy of all balances to be restored later """
+        return array('i', self._balances)
+
+    def restore(self, snapshot):
+        """ Set all balances from the snapshot """
+        if self._journal:
+            self._journal.record(self._set_balances, self.snapshot())
+        self._set_balances(snapshot)
+
+    def _set_balances(self, balances):
+        # accounts opened after the snapshot was taken are left empty
+        size = len(balances)
+        self._balances[:size] = balances
+        for slot in range(size, len(self._balances)):
+            self._balances[slot] = 0
+
+    def reset(self):
+        """ Zero all balances """
+        for slot in range(len(self._balances)):
+            self._balances[slot] = 0
+
+    def clone(self):
+        """ Copy of the bank with all balances """
+        bank = Bank.__new__(Bank)
+        bank._slots = dict(self._slots)
+        bank._balances = array('i', self._balances)
+        bank._accounts = {}
+        bank._journal = None
+        return bank
 
 
 class BankAccount:
-    def __init__(self, bank: Bank):
+    """ Facade for a single balance stored in the bank """
+
+    __slots__ = ('_bank', '_slot')
+
+    def __init__(self, bank: Bank, slot: int):
         self._bank = bank
-        self._balance = 0
+        self._slot = slot
 
     @property
     def balance(self):
         """ Account balance, cannot be negative """
-        return self._balance
+        return self._bank._balances[self._slot]
 
     def withdraw(self, amount):
         """ Withdraw money from the account """
         assert amount > 0
-        if amount > self._balance:
-            raise GameError('not enough gold on the account (requested {amount} from {balance})'.format(amount=amount, balance=self._balance))
-        self._balance -= amount
+        balances = self._bank._balances
+        balance = balances[self._slot]
+        if amount > balance:
+            raise GameError('not enough gold on the account (requested {amount} from {balance})'.format(amount=amount, balance=balance))
+        balances[self._slot] = balance - amount
+        if self._bank._journal:
+            self._bank._journal.record(self._set_balance, balance)
         return amount
 
     def cash_in(self, amount):
         """ Put money into the account """
         assert amount > 0
-        self._balance += amount
+        balances = self._bank._balances
+        balance = balances[self._slot]
+        balances[self._slot] = balance + amount
+        if self._bank._journal:
+            self._bank._journal.record(self._set_balance, balance)
         return amount
 
+    def _set_balance(self, balance):
+        self._bank._balances[self._slot] = balance
+
 
 class PlayerListener:
+    __slots__ = ()
+
+    @noop
     def cashed_in(self, player, amount: int, source: str):
         pass
 
+    @noop
     def withdrawn(self, player, amount: int):
         pass
 
+    @noop
     def picked_char(self, player, char: Character):
         pass
 
+    @noop
     def taken_card(self, player, district: District):
         pass
 
+    @noop
+    def removed_card(self, player, district: District):
+        pass
+
+    @noop
     def district_built(self, player, district: District):
         pass
 
+    @noop
     def district_lost(self, player, district: District):
         pass
 
+    @noop
     def swapped_hands(self, player, other_player):
         pass
 
+    @noop
     def replaced_hand(self, player, amount: int):
         pass
 
 
+CITY_SIZE = 8  # END-BUILD8
+
+
 class Player(EventSource):
+    __slots__ = ('name', '_id', '_game', '_char', '_hand', '_city', '_shared', '_hand_hash', '_city_hash',
+                 '_hand_view', '_city_view', '_city_mask', '_base_score', '_colors_mask', '_city_complete')
+
     def __init__(self, player_id, game, char=None, hand=None, city=None):
         super().__init__()
         self.name = ''
@@ -79,11 +182,57 @@ class Player(EventSource):
         self._char = char
         self._hand = list(hand) if hand else []
         self._city = list(city) if city else []
+        self._shared = False  # hand and city lists are shared with a clone until the first change
+        self._hand_hash = sum(zobrist.hand_keys[player_id][district.value] for district in self._hand)
+        self._city_hash = sum(zobrist.city_keys[player_id][district.value] for district in self._city)
+        self._hand_view = None  # cached tuples, dropped on every change
+        self._city_view = None
+        self._city_mask = districts_mask(self._city)
+        self._base_score = sum(district_costs[district.value] for district in self._city)
+        self._colors_mask = 0  # bit per Color.value built in the city
+        for district in self._city:
+            self._colors_mask |= 1 << district_colors[district.value]
+        self._city_complete = len(self._city) >= CITY_SIZE
 
     def reset(self):
         self._char = None
-        self._hand.clear()
-        self._city.clear()
+        self._hand = []
+        self._city = []
+        self._shared = False
+        self._hand_hash = 0
+        self._city_hash = 0
+        self._hand_view = None
+        self._city_view = None
+        self._city_mask = 0
+        self._base_score = 0
+        self._colors_mask = 0
+        self._city_complete = False
+
+    def clone(self, game):
+        """ Detached copy of the player for the cloned game, hand and city are copied on write """
+        player = Player.__new__(Player)
+        EventSource.__init__(player)
+        player.name = self.name
+        player._id = self._id
+        player._game = game
+        player._char = self._char
+        player._hand = self._hand
+        player._city = self._city
+        player._shared = self._shared = True
+        player._hand_hash = self._hand_hash
+        player._city_hash = self._city_hash
+        player._hand_view = self._hand_view
+        player._city_view = self._city_view
+        player._city_mask = self._city_mask
+        player._base_score = self._base_score
+        player._colors_mask = self._colors_mask
+        player._city_complete = self._city_complete
+        return player
+
+    def _unshare(self):
+        self._hand = list(self._hand)
+        self._city = list(self._city)
+        self._shared = False
 
     @property
     def player_id(self):
@@ -97,17 +246,26 @@ class Player(EventSource):
     @property
     def gold(self):
         """ Amount of player's gold """
-        return self._bank_account.balance
+        return self._game._bank.balance(self._id)
+
+    @property
+    def zobrist(self):
+        """ Hash of player's state: hand, city, char and gold """
+        player_id = self._id
+        return (self._hand_hash + self._city_hash + zobrist.char_key(player_id, self._char) +
+                zobrist.gold_keys[player_id] * self.gold) & zobrist.MASK
 
     def cash_in(self, amount, source=''):
         """ Give some gold """
         amount = self._bank_account.cash_in(amount)
+        self._game._version += 1
         self.fire_event('cashed_in', self, amount, source)
         return amount
 
     def withdraw(self, amount):
         """ Remove some gold """
         amount = self._bank_account.withdraw(amount)
+        self._game._version += 1
         self.fire_event('withdrawn', self, amount)
         return amount
 
@@ -120,35 +278,145 @@ class Player(EventSource):
 
     @char.setter
     def char(self, value):
+        if self._game._journal:
+            self._game._journal.record(self._set_char, self._char)
         self._char = value
+        self._game._version += 1
         self.fire_event('picked_char', self, self._char)
 
+    def _set_char(self, char):
+        self._char = char
+        self._game._players_proxy.picked_char(self, char)
+
     @property
     def city(self):
-        return tuple(self._city)
+        view = self._city_view
+        if view is None:
+            view = self._city_view = tuple(self._city)
+        return view
+
+    @property
+    def city_mask(self):
+        """ Bit mask of the districts built in the city, see cards.district_bit """
+        return self._city_mask
+
+    @property
+    def base_score(self):
+        """ Sum of the costs of the districts built in the city """
+        return self._base_score
+
+    @property
+    def colors_mask(self):
+        """ Bit mask of the colors built in the city, bit per Color.value """
+        return self._colors_mask
+
+    @property
+    def city_complete(self):
+        """ City has reached the size ending the game """
+        return self._city_complete
 
     @property
     def hand(self):
-        return tuple(self._hand)
+        view = self._hand_view
+        if view is None:
+            view = self._hand_view = tuple(self._hand)
+        return view
 
     def take_card(self, district: District):
+        if self._shared:
+            self._unshare()
         self._hand.append(district)
+        self._hand_hash += zobrist.hand_keys[self._id][district.value]
+        self._hand_view = None
+        self._game._version += 1
+        if self._game._journal:
+            self._game._journal.record(self._undo_take_card)
         self.fire_event('taken_card', self, district)
 
     def remove_card(self, district: District):
+        if self._shared:
+            self._unshare()
+        if self._game._journal:
+            self._game._journal.record(self._undo_remove_card, self._hand.index(district), district)
         self._hand.remove(district)
+        self._hand_hash -= zobrist.hand_keys[self._id][district.value]
+        self._hand_view = None
+        self._game._version += 1
         self.fire_event('removed_card', self, district)
 
     def build_district(self, district: District):
+        if self._shared:
+            self._unshare()
         self._city.append(district)
+        self._city_added(district)
+        self._game._version += 1
+        if self._game._journal:
+            self._game._journal.record(self._undo_build_district)
         self.fire_event('district_built', self, district)
 
     def destroy_district(self, district: District):
+        if self._shared:
+            self._unshare()
+        if self._game._journal:
+            self._game._journal.record(self._undo_destroy_district, self._city.index(district), district)
         self._city.remove(district)
+        self._city_removed(district)
+        self._game._version += 1
         self.fire_event('district_lost', self, district)
 
+    def _undo_take_card(self):
+        if self._shared:
+            self._unshare()
+        self._hand_hash -= zobrist.hand_keys[self._id][self._hand.pop().value]
+        self._hand_view = None
+
+    def _undo_remove_card(self, index, district):
+        if self._shared:
+            self._unshare()
+        self._hand.insert(index, district)
+        self._hand_hash += zobrist.hand_keys[self._id][district.value]
+        self._hand_view = None
+
+    def _undo_build_district(self):
+        if self._shared:
+            self._unshare()
+        self._city_removed(self._city.pop())
+
+    def _undo_destroy_district(self, index, district):
+        if self._shared:
+            self._unshare()
+        self._city.insert(index, district)
+        self._city_added(district)
+
+    def _city_added(self, district):
+        value = district.value
+        self._city_hash += zobrist.city_keys[self._id][value]
+        self._city_view = None
+        self._city_mask |= 1 << value
+        self._base_score += district_costs[value]
+        self._colors_mask |= 1 << district_colors[value]
+        if not self._city_complete and len(self._city) >= CITY_SIZE:
+            self._city_complete = True
+            self._game._completed_cities += 1
+
+    def _city_removed(self, district):
+        value = district.value
+        self._city_hash -= zobrist.city_keys[self._id][value]
+        self._city_view = None
+        if district not in self._city:
+            self._city_mask &= ~(1 << value)
+        self._base_score -= district_costs[value]
+        color = district_colors[value]
+        if not self._city_mask & color_masks[color]:
+            self._colors_mask &= ~(1 << color)
+        if self._city_complete and len(self._city) < CITY_SIZE:
+            self._city_complete = False
+            self._game._completed_cities -= 1
+
 
 class Turn:
+    __slots__ = ('_game', '_unused_chars', '_killed_char', '_robbed_char', '_first_completer')
+
     def __init__(self, game):
         self._game = game
         self._unused_chars = []
@@ -156,9 +424,44 @@ class Turn:
         self._robbed_char = None
         self._first_completer = None
 
+    def reset(self):
+        """ Clear per-turn info in place """
+        if self._game._journal:
+            self._game._journal.record(self._set_state, list(self._unused_chars), self._killed_char, self._robbed_char,
+                                       self._first_completer)
+        self._unused_chars.clear()
+        self._killed_char = None
+        self._robbed_char = None
+        self._first_completer = None
+        self._game._version += 1
+
+    def _set_state(self, unused_chars, killed_char, robbed_char, first_completer):
+        self._unused_chars[:] = unused_chars
+        self._killed_char = killed_char
+        self._robbed_char = robbed_char
+        self._first_completer = first_completer
+
+    def clone(self, game):
+        """ Copy of the turn for the cloned game """
+        turn = Turn(game)
+        turn._unused_chars = list(self._unused_chars)
+        turn._killed_char = self._killed_char
+        turn._robbed_char = self._robbed_char
+        if self._first_completer:
+            turn._first_completer = game.players.find_by_id(self._first_completer.player_id)
+        return turn
+
+    @property
+    def zobrist(self):
+        """ Hash of per-turn info """
+        return zobrist.turn_hash(self) & zobrist.MASK
+
     def drop_char(self, char: Character):
         """ Remove character from playable set """
         self._unused_chars.append(char)
+        self._game._version += 1
+        if self._game._journal:
+            self._game._journal.record(self._unused_chars.pop)
 
     @property
     def unused_chars(self):
@@ -171,7 +474,10 @@ class Turn:
     @killed_char.setter
     def killed_char(self, char):
         assert char
+        if self._game._journal:
+            self._game._journal.record(setattr, self, '_killed_char', self._killed_char)
         self._killed_char = char
+        self._game._version += 1
         self._game.fire_event('murder_announced', char)
 
     @property
@@ -181,7 +487,10 @@ class Turn:
     @robbed_char.setter
     def robbed_char(self, char):
         assert char
+        if self._game._journal:
+            self._game._journal.record(setattr, self, '_robbed_char', self._robbed_char)
         self._robbed_char = char
+        self._game._version += 1
         self._game.fire_event('theft_announced', char)
 
     @property
@@ -190,13 +499,54 @@ class Turn:
 
     @first_completer.setter
     def first_completer(self, player):
+        if self._game._journal:
+            self._game._journal.record(setattr, self, '_first_completer', self._first_completer)
         self._first_completer = player
+        self._game._version += 1
+
+
+class GameListener:
+    __slots__ = ()
+
+    @noop
+    def player_added(self, player: Player):
+        pass
+
+    @noop
+    def player_crowned(self, player: Player):
+        pass
+
+    @noop
+    def murder_announced(self, char: Character):
+        pass
+
+    @noop
+    def theft_announced(self, char: Character):
+        pass
+
+
+class PlayersProxy(PlayerListener, GameListener):
+    """ Players with lookups by id, name and char and the turn orders
 
+    Game keeps a single proxy listening to the game and the players: indexes and orders are built on demand
+    and dropped when a char is picked or the crown moves.
+    """
+
+    __slots__ = ('_players', '_crowned_player', '_by_id', '_by_name', '_by_char', '_crowned_index',
+                 '_char_selection_order', '_take_turn_order')
 
-class PlayersProxy:
     def __init__(self, players, crowned_player):
         self._players = players
         self._crowned_player = crowned_player
+        self._invalidate()
+
+    def _invalidate(self):
+        self._by_id = None
+        self._by_name = None
+        self._by_char = None
+        self._crowned_index = None
+        self._char_selection_order = None
+        self._take_turn_order = None
 
     def __iter__(self):
         return iter(self._players)
@@ -209,59 +559,171 @@ class PlayersProxy:
 
     def order_by_char_selection(self):
         """ Players in order of character selection """
-        index = self.crowned_index
-        if index == -1:
-            return tuple(self._players)
-        else:
-            return tuple(self._players[index:] + self._players[:index])
+        order = self._char_selection_order
+        if order is None:
+            index = self.crowned_index
+            if index == -1:
+                order = tuple(self._players)
+            else:
+                order = tuple(self._players[index:] + self._players[:index])
+            self._char_selection_order = order
+        return order
 
     def order_by_take_turn(self):
         """ Players in order of making their turn """
-        return tuple(sorted(self._players, key=lambda p: p.char))
+        order = self._take_turn_order
+        if order is None:
+            order = self._take_turn_order = tuple(sorted(self._players, key=lambda p: p.char))
+        return order
 
     def find_by_name(self, name):
         """ Return first player with given name or None """
-        return next((p for p in self._players if p.name == name), None)
+        # names are given before players join, so the index only changes with the players list
+        if self._by_name is None:
+            self._by_name = self._index(lambda p: p.name)
+        return self._by_name.get(name)
 
     @property
     def crowned_index(self):
         """ Index of the crowned player """
-        return self._players.index(self._crowned_player) if self._crowned_player else -1
+        index = self._crowned_index
+        if index is None:
+            index = self._crowned_index = self._players.index(self._crowned_player) if self._crowned_player else -1
+        return index
 
     def find_by_id(self, player_id):
         """ Return player with given id or None """
-        return next((p for p in self._players if p.player_id == player_id), None)
+        if self._by_id is None:
+            self._by_id = self._index(lambda p: p.player_id)
+        return self._by_id.get(player_id)
 
     def find_by_char(self, char):
         """ Return player that is a given char or None """
-        return next((p for p in self._players if p.char == char), None)
-
+        if self._by_char is None:
+            self._by_char = self._index(lambda p: p.char)
+        return self._by_char.get(char)
 
-class GameListener:
-    def player_added(self, player: Player):
-        pass
+    def _index(self, key):
+        index = {}
+        for player in self._players:
+            index.setdefault(key(player), player)  # first player wins
+        return index
 
-    def player_crowned(self, player: Player):
-        pass
+    def player_added(self, player):
+        player.add_listener(self)
+        self._invalidate()
 
-    def murder_announced(self, char: Character):
-        pass
+    def player_crowned(self, player):
+        self._crowned_player = player
+        self._crowned_index = None
+        self._char_selection_order = None
 
-    def theft_announced(self, char: Character):
-        pass
+    def picked_char(self, player, char):
+        self._by_char = None
+        self._take_turn_order = None
 
 
 class Game(EventSource):
-    def __init__(self, characters: Deck, districts: Deck):
+    __slots__ = ('_journal', '_rng', '_players', '_players_proxy', '_bank', '_crowned_player', '_turn', '_orig_chars',
+                 '_chars', '_orig_districts', '_colors', '_colors_mask', '_districts', '_completed_cities', '_pool',
+                 '_version')
+
+    def __init__(self, characters: Deck, districts: Deck, rng=None):
         super().__init__()
+        self._journal = None
+        self._rng = rng or random.Random()
         self._players = []
+        self._players_proxy = PlayersProxy(self._players, None)
+        self.add_listener(self._players_proxy)  # first, so other listeners see the updated proxy
         self._bank = Bank()
         self._crowned_player = None
         self._turn = Turn(self)
-        self._orig_chars = deepcopy(characters)
-        self._chars = None
-        self._orig_districts = deepcopy(districts)
-        self._districts = deepcopy(self._orig_districts)
+        self._orig_chars = tuple(characters)  # templates the decks are refilled from
+        self._chars = CharacterDeck(())
+        self._orig_districts = DistrictDeck(districts)
+        self._colors = frozenset(color for color in all_colors if self._orig_districts.copies_of_color(color))
+        self._colors_mask = sum(1 << color.value for color in self._colors)
+        self._districts = self._orig_districts.clone()
+        self._completed_cities = 0  # players with city_complete, kept by the players
+        self._pool = Pool()
+        self._version = 0  # bumped by every change of players, crown and turn, see version
+
+    def clone(self, rng=None):
+        """ Detached copy of the game state for look-ahead: listeners are dropped, immutable data is shared
+
+        The copy continues the game's random stream unless another rng is given.
+        """
+        game = Game.__new__(Game)
+        EventSource.__init__(game)
+        game._journal = None
+        if rng is None:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self._rng.getstate())
+        game._rng = rng
+        game._players = [player.clone(game) for player in self._players]
+        game._bank = self._bank.clone()
+        game._crowned_player = game._players[self._players.index(self._crowned_player)] if self._crowned_player else None
+        game._players_proxy = PlayersProxy(game._players, game._crowned_player)
+        game.add_listener(game._players_proxy)
+        for player in game._players:
+            player.add_listener(game._players_proxy)
+        game._turn = self._turn.clone(game)
+        game._orig_chars = self._orig_chars
+        game._chars = self._chars.clone()
+        game._orig_districts = self._orig_districts
+        game._colors = self._colors
+        game._colors_mask = self._colors_mask
+        game._districts = self._districts.clone()
+        game._completed_cities = self._completed_cities
+        game._pool = Pool()
+        game._version = 0
+        return game
+
+    @property
+    def zobrist(self):
+        """ 64-bit hash of the game state: players, crown, turn info and composition of both decks """
+        h = self._turn.zobrist + self._chars.zobrist + self._districts.zobrist
+        for player in self._players:
+            h += player.zobrist
+        if self._crowned_player:
+            h += zobrist.crown_keys[self._crowned_player.player_id]
+        return h & zobrist.MASK
+
+    @property
+    def version(self):
+        """ Mutation counter for caching data derived from players, crown and turn, decks are not covered """
+        return self._version
+
+    @property
+    def journal(self):
+        """ Undo journal or None if the game is not journaled """
+        return self._journal
+
+    def enable_journal(self):
+        """ Start recording changes, so that they can be rolled back """
+        if not self._journal:
+            self._journal = Journal()
+            self._attach_journal()
+
+    def disable_journal(self):
+        """ Stop recording changes, all marks become invalid """
+        self._journal = None
+        self._attach_journal()
+
+    def _attach_journal(self):
+        self._bank._journal = self._journal
+        self._districts._journal = self._journal
+        self._chars._journal = self._journal
+
+    def mark(self):
+        """ Position in the journal to roll back to """
+        assert self._journal, 'journal is not enabled'
+        return self._journal.mark()
+
+    def rollback(self, mark):
+        """ Undo all changes made since the mark """
+        self._journal.rollback(mark)
+        self._version += 1
 
     def add_player(self, name, char=None, hand=None, city=None):
         """ Add new player to the game """
@@ -269,13 +731,16 @@ class Game(EventSource):
         player = Player(player_id, self, char=char, hand=hand, city=city)
         player.name = name
         self._players.append(player)
+        if player.city_complete:
+            self._completed_cities += 1
+        self._version += 1
         self.fire_event('player_added', player)
         return player
 
     @property
     def players(self):
         """ List of players """
-        return PlayersProxy(self._players, self._crowned_player)
+        return self._players_proxy
 
     @property
     def characters(self):
@@ -287,6 +752,31 @@ class Game(EventSource):
         """ Districts deck """
         return self._districts
 
+    @property
+    def rng(self):
+        """ Game's source of randomness, reseed it to replay the game """
+        return self._rng
+
+    @property
+    def colors(self):
+        """ Colors of the districts the game is played with """
+        return self._colors
+
+    @property
+    def colors_mask(self):
+        """ Bit mask of the colors the game is played with, bit per Color.value """
+        return self._colors_mask
+
+    @property
+    def completed_cities(self):
+        """ Number of players whose city has reached the size ending the game """
+        return self._completed_cities
+
+    @property
+    def pool(self):
+        """ Free lists for per-turn objects, counters are cleared by new_game """
+        return self._pool
+
     @property
     def bank(self):
         """ Game's gold storage """
@@ -301,7 +791,10 @@ class Game(EventSource):
     def crowned_player(self, player):
         """ Player who has the crown now """
         assert player in self._players
+        if self._journal:
+            self._journal.record(self._set_crowned_player, self._crowned_player)
         self._crowned_player = player
+        self._version += 1
         self.fire_event('player_crowned', player)
 
     @property
@@ -311,17 +804,26 @@ class Game(EventSource):
 
     def new_game(self):
         """ Prepare data for new game """
-        self._districts = deepcopy(self._orig_districts)
-        self._districts.shuffle()  # DISTRICT-DECK
+        self._pool.clear_counters()
+        self._districts.refill(self._orig_districts)
+        self._districts.shuffle(self._rng)  # DISTRICT-DECK
 
     def new_turn(self):
         """ Prepare data for new turn """
-        self._turn = Turn(self)
-        self._chars = deepcopy(self._orig_chars)
-        self._chars.shuffle()  # CHAR-DECK
+        self._pool.reset(self._turn)
+        self._chars.refill(self._orig_chars)
+        self._chars.shuffle(self._rng)  # CHAR-DECK
+
+    def _set_crowned_player(self, player):
+        self._crowned_player = player
+        self._players_proxy.player_crowned(player)
 
     def reset(self):
         for player in self._players:
             player.reset()
+        self._players_proxy._invalidate()
+        self._players_proxy._crowned_player = None
+        self._completed_cities = 0
         self._crowned_player = None
-        self._bank = Bank()
+        self._bank.reset()
+        self._version += 1
@@ -3,9 +3,9 @@ from enum import Enum, auto
 from itertools import chain
 import random
 
-from citadels.cards import Card, Character, CharacterInfo, Deck, District, DistrictInfo
+from citadels.cards import Character, Deck, District, facedown_char
 from citadels import commands
-from citadels.event import EventSource, EventTransaction
+from citadels.event import EventSource, EventTransaction, noop
 from citadels.game import Game, GameError, Player
 from citadels import rules
 from citadels.shadow import ShadowGame, ShadowPlayer
@@ -19,14 +19,26 @@ class CommandSpecifier(Enum):
 
 
 class CommandsSink:
+    __slots__ = ('_player', '_game', '_done', '_possible_commands', '_used_commands')
+
     def __init__(self, player: Player, game: Game):
         self._player = player
         self._game = game
         self._done = False
-        self._possible_commands = defaultdict(list)
+        self._possible_commands = {specifier: [] for specifier in CommandSpecifier}  # fixed order of kinds
         self._used_commands = defaultdict(list)
         self._update()
 
+    def reset(self, player: Player):
+        """ Reuse the sink for the next player's turn, commands of the previous turn go back to the pool and become invalid """
+        self._clear()
+        for used_commands in self._used_commands.values():
+            self._release(used_commands)
+        self._player = player
+        self._done = False
+        self._used_commands.clear()
+        self._update()
+
     @property
     def possible_actions(self):
         return tuple(self._possible_commands[CommandSpecifier.Action])
@@ -72,25 +84,43 @@ class CommandsSink:
         if command.restriction & commands.Restriction.OnEndTurn:
             self._clear()
             return
-        self._update()
+        affected = _affected_specifiers.get(type(command))
+        self._update((command.specifier,) + affected if affected is not None else tuple(CommandSpecifier))
 
     def _clear(self):
-        self._possible_commands.clear()
-
-    def _update(self):
-        self._possible_commands.clear()
-
+        for specifier in CommandSpecifier:
+            self._set_possible(specifier, [])
+
+    def _update(self, specifiers=tuple(CommandSpecifier)):
+        """ Recompute possible commands of the given kinds, the others are kept as they are """
+        # kinds are recomputed in this order: compulsory abilities may change gold before builds are checked
+        if CommandSpecifier.Action in specifiers:
+            self._update_actions()
+        if CommandSpecifier.Ability in specifiers:
+            self._update_abilities()
+        if CommandSpecifier.Build in specifiers:
+            self._update_builds()
+        if CommandSpecifier.Income in specifiers:
+            self._update_income()
+
+    def _update_actions(self):
+        actions = []
         if not self._used_commands[CommandSpecifier.Action]:
-            self._possible_commands[CommandSpecifier.Action] = rules.possible_actions(self._game)
+            actions = rules.possible_actions(self._game, self._game.pool)
+        self._set_possible(CommandSpecifier.Action, actions)
 
+    def _update_abilities(self):
+        abilities = []
         if not self._used_commands[CommandSpecifier.Ability]:
-            char_workflow = rules.CharacterWorkflow(self._player.char)
+            char_workflow = rules.CharacterWorkflow(self._player.char, self._game.pool)
             for ability in char_workflow.abilities:
                 if isinstance(ability, commands.InteractiveCommand):
-                    if not ability.ready and not ability.choices(self._player, self._game):  # rare case when Destroy cannot be applied
+                    if not ability.ready and not ability.has_choices(self._player, self._game):  # rare case when Destroy cannot be applied
+                        self._release((ability,))
                         continue
                 if ability.restriction & commands.Restriction.OnAfterAction:
                     if not self._used_commands[CommandSpecifier.Action]:
+                        self._release((ability,))
                         continue
                     if ability.restriction & commands.Restriction.Compulsory:
                         assert not isinstance(ability, commands.InteractiveCommand)
@@ -99,32 +129,64 @@ class CommandsSink:
                         continue
                 if ability.restriction & commands.Restriction.OnEndTurn:
                     if not self._used_commands[CommandSpecifier.Action]:
+                        self._release((ability,))
                         continue
-                self._possible_commands[CommandSpecifier.Ability].append(ability)
+                abilities.append(ability)
+        self._set_possible(CommandSpecifier.Ability, abilities)
 
+    def _update_builds(self):
         # BUILD
+        builds = []
         if self._used_commands[CommandSpecifier.Action]:
             if len(self._used_commands[CommandSpecifier.Build]) < rules.how_many_districts_can_build(self._player):
-                build_command = commands.Build()
-                if build_command.choices(self._player, self._game):
-                    self._possible_commands[CommandSpecifier.Build].append(build_command)
-
+                build_command = self._game.pool.acquire(commands.Build)
+                if build_command.has_choices(self._player, self._game):
+                    builds.append(build_command)
+                else:
+                    self._release((build_command,))
+        self._set_possible(CommandSpecifier.Build, builds)
+
+    def _update_income(self):
         # INCOME
+        incomes = []
         if not self._used_commands[CommandSpecifier.Income]:
-            color = CharacterInfo(self._player.char).color
-            income = sum(DistrictInfo(district).color == color for district in self._player.city)
+            income = rules.income(self._player)
             if income:
-                self._possible_commands[CommandSpecifier.Income].append(commands.CashIn(income, source='income', restriction=commands.Restriction.Compulsory))
-
-        self._assign_specifiers()
-
-    def _assign_specifiers(self):
-        for specifier, commands in self._possible_commands.items():
-            for command in commands:
-                setattr(command, 'specifier', specifier)
+                income_command = self._game.pool.acquire(commands.CashIn, income, source='income', restriction=commands.Restriction.Compulsory)
+                incomes.append(income_command)
+        self._set_possible(CommandSpecifier.Income, incomes)
+
+    def _set_possible(self, specifier, possible_commands):
+        for command in possible_commands:
+            command.specifier = specifier
+        dropped = self._possible_commands[specifier]
+        self._possible_commands[specifier] = possible_commands
+        # executed commands are released by reset(), the others are not possible anymore
+        used = self._used_commands[specifier]
+        self._release([command for command in dropped if not any(command is c for c in used)])
+
+    def _release(self, dropped):
+        pool = self._game.pool
+        for command in dropped:
+            command.release()
+            pool.release(command)
+
+
+# kinds of possible commands that executing a command of the class may change, besides its own kind;
+# classes not listed may change anything
+_affected_specifiers = {
+    commands.Kill: (),
+    commands.Rob: (),
+    commands.SwapHands: (CommandSpecifier.Build,),  # hand
+    commands.ReplaceHand: (CommandSpecifier.Build,),  # hand
+    commands.Build: (CommandSpecifier.Ability, CommandSpecifier.Build, CommandSpecifier.Income),  # gold, hand, city
+}
 
 
 class PlayerController:
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
     def pick_char(self, char_deck: Deck, player: Player, game: Game):
         """ Should return selected char card """
         raise NotImplementedError()
@@ -140,63 +202,83 @@ class GamePlayConfig:
 
 
 class GamePlayEvents:
+    @noop
     def player_added(self, player: Player):
         pass
 
+    @noop
     def player_crowned(self, player: Player):
         pass
 
+    @noop
     def murder_announced(self, char: Character):
         pass
 
+    @noop
     def theft_announced(self, char: Character):
         pass
 
+    @noop
     def player_cashed_in(self, player: Player, amount: int, source: str):
         pass
 
+    @noop
     def player_withdrawn(self, player: Player, amount: int):
         pass
 
+    @noop
     def player_picked_char(self, player: Player, char: Character):
         pass
 
+    @noop
     def player_taken_card(self, player: Player, district: District):
         pass
 
+    @noop
     def player_taken_some_cards(self, player: Player, amount: int):
         pass
 
+    @noop
     def player_removed_card(self, player: Player, district: District):
         pass
 
+    @noop
     def player_built_district(self, player: Player, district: District):
         pass
 
+    @noop
     def player_lost_district(self, player: Player, district: District):
         pass
 
+    @noop
     def turn_started(self):
         pass
 
+    @noop
     def turn_ended(self):
         pass
 
+    @noop
     def player_killed(self, player: Player):
         pass
 
+    @noop
     def player_robbed(self, player: Player, gold: int):
         pass
 
+    @noop
     def player_plays(self, player: Player, char: Character):
         pass
 
+    @noop
     def player_played(self, player: Player):
         pass
 
+    @noop
     def player_swapped_hands(self, player, other_player):
         pass
 
+    @noop
     def player_replaced_hand(self, player, amount: int):
         pass
 
@@ -217,6 +299,8 @@ class GameController(EventSource):
         self._config = config or GamePlayConfig()
         self._player_controllers = {}
         self._state = GameplayState.START_GAME
+        self._command_sink = None  # reused for every player's turn
+        self._shadows = {}  # player id -> (ShadowPlayer, ShadowGame), updated before every call of the player's controller
 
     def play(self):
         if self._state == GameplayState.START_GAME:
@@ -244,6 +328,16 @@ class GameController(EventSource):
         assert player in self._game.players
         return self._player_controllers[player.player_id]
 
+    def _shadows_of(self, player: Player):
+        # shadows keep no reference to the live game, so they are brought up to date here rather than by themselves
+        shadows = self._shadows.get(player.player_id)
+        if shadows is None:
+            shadows = self._shadows[player.player_id] = (ShadowPlayer(player, me=True), ShadowGame(player, self._game))
+        else:
+            shadows[0].update(player)
+            shadows[1].update(self._game)
+        return shadows
+
     def start_game(self):
         game = self._game
         if len(game.players) < 2:
@@ -262,14 +356,15 @@ class GameController(EventSource):
 
         # START-CROWN
         if not game.crowned_player:
-            game.crowned_player = random.choice(game.players)
+            game.crowned_player = game.rng.choice(game.players)
 
     def start_turn(self):
         game = self._game
         game.new_turn()
 
         # TURN-FACEDOWN
-        game.turn.drop_char(Card(game.characters.take_random()).facedown)
+        game.characters.take_random(game.rng)
+        game.turn.drop_char(facedown_char)
 
         # TURN-FACEUP
         if self._config.turn_unused_faceup_chars:
@@ -277,11 +372,11 @@ class GameController(EventSource):
         else:
             faceup_cards = {2: 2, 3: 2, 4: 2, 5: 1, 6: 0, 7: 0}[len(self._game.players)]
         for _ in range(faceup_cards):
-            card = game.characters.take_random()
+            card = game.characters.take_random(game.rng)
 
             # TURN-FACEUP-KING
             if card == Character.King:
-                card = game.characters.take_random()
+                card = game.characters.take_random(game.rng)
                 game.characters.put_on_bottom(Character.King)
 
             game.turn.drop_char(card)
@@ -291,13 +386,14 @@ class GameController(EventSource):
         # TURN-PICK-FIRST, TURN-PICK
         for player in game.players.order_by_char_selection():
             controller = self.player_controller(player)
-            selected_char = controller.pick_char(game.characters, ShadowPlayer(player, me=True), ShadowGame(player, game))
+            selected_char = controller.pick_char(Deck(game.characters), *self._shadows_of(player))  # a copy holds only the cards left
             game.characters.take(selected_char)
             player.char = selected_char
 
         # TURN-PICK-FACEDOWN
         while game.characters:
-            game.turn.drop_char(Card(game.characters.take_from_top()).facedown)
+            game.characters.take_from_top()
+            game.turn.drop_char(facedown_char)
 
     def take_turns(self):
         if self.game_over:
@@ -328,9 +424,13 @@ class GameController(EventSource):
                 game.crowned_player = player  # fires event itself
 
             player_controller = self.player_controller(player)
-            command_sink = CommandsSink(player, game)
+            if self._command_sink is None:
+                self._command_sink = CommandsSink(player, game)
+            else:
+                game.pool.reset(self._command_sink, player)
+            command_sink = self._command_sink
             while not command_sink.done:
-                player_controller.take_turn(ShadowPlayer(player, me=True), ShadowGame(player, game), command_sink)
+                player_controller.take_turn(*self._shadows_of(player), command_sink)
 
             if rules.is_city_complete(player) and not game.turn.first_completer:
                 game.turn.first_completer = player
@@ -345,7 +445,7 @@ class GameController(EventSource):
 
     @property
     def game_over(self):
-        return any(rules.is_city_complete(player) for player in self._game.players)
+        return rules.is_game_over(self._game)
 
     def end_turn(self):
         for player in self._game.players:
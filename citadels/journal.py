@@ -0,0 +1,23 @@
+class Journal:
+    """ Log of undo steps for searching in place: mark() a position and rollback() to it in O(changes)
+
+    Mutators record how to undo themselves while a journal is attached, undo steps don't fire events.
+    """
+
+    def __init__(self):
+        self._steps = []
+
+    def record(self, undo, *args):
+        """ Remember how to undo the change that has just been made """
+        self._steps.append((undo, args))
+
+    def mark(self):
+        """ Position to roll back to """
+        return len(self._steps)
+
+    def rollback(self, mark):
+        """ Undo all changes made since the mark, most recent first """
+        steps = self._steps
+        while len(steps) > mark:
+            undo, args = steps.pop()
+            undo(*args)
@@ -0,0 +1,133 @@
+from citadels.cards import Character, District
+from citadels import commands
+from citadels.game import Game, GameError, Player
+from citadels.gameplay import CommandSpecifier, CommandsSink
+
+
+class Move:
+    """ Fully specified atomic move: kind and class of the command plus the choices to select, players are referred by id
+
+    Drawn cards may be unknown to a bot, so draw moves keep the kept cards by their positions among the drawn ones.
+
+    Moves are interned: equal moves are the same object, hashed by a small id assigned in order of first appearance.
+    """
+
+    __slots__ = ('specifier', 'command', 'choices', 'id')
+
+    def __new__(cls, specifier: CommandSpecifier, command: type, choices=()):
+        choices = tuple(choices)
+        key = _key(specifier, command, choices)
+        move = _moves_by_key.get(key)
+        if move is None:
+            move = _intern(key, specifier, command, choices)
+        return move
+
+    def __setattr__(self, name, value):
+        raise AttributeError('moves are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('moves are immutable')
+
+    def __hash__(self):
+        return self.id
+
+    def __reduce__(self):
+        # unpickled and copied moves are interned again
+        return Move, (self.specifier, self.command, self.choices)
+
+    def __repr__(self):
+        if self.command is None:
+            return 'EndTurn()'
+        return '{}({})'.format(self.command.__name__, ', '.join(map(_choice_repr, self.choices)))
+
+    @staticmethod
+    def by_id(move_id: int):
+        return _moves[move_id]
+
+    @staticmethod
+    def from_command(command: commands.Command):
+        """ Move of a command taken from the sink, interactive commands should be ready """
+        if isinstance(command, commands.DrawSomeCards):
+            choices = command.selected_positions
+        elif isinstance(command, commands.InteractiveCommand):
+            choices = command.selected
+        else:
+            choices = ()
+        return Move(command.specifier, type(command), map(_encode, choices))
+
+    def to_command(self, player: Player, game: Game, sink: CommandsSink):
+        """ The sink's possible command of the move with the choices selected, ready for execution """
+        for command in sink.all_possible_commands:
+            if type(command) is self.command and command.specifier is self.specifier:
+                break
+        else:
+            raise GameError('move {} is not possible now'.format(self))
+        if self.command is commands.DrawSomeCards:
+            command.choices(player, game)  # draws the cards
+            for position in self.choices:
+                command.select_at(position)
+        else:
+            for choice in self.choices:
+                command.select(choice if _is_card(choice) else game.players.find_by_id(choice))
+        if self.choices:
+            assert command.ready
+        return command
+
+
+_moves = []  # by id
+_moves_by_key = {}
+
+
+def _is_card(choice):
+    return isinstance(choice, (Character, District))
+
+
+def _choice_repr(choice):
+    return choice.name if _is_card(choice) else str(choice)
+
+
+def _encode(choice):
+    """ Players are kept by id so that moves do not pin a particular game copy """
+    return choice if _is_card(choice) or isinstance(choice, int) else choice.player_id
+
+
+def _key(specifier, command, choices):
+    # Enum hashing is slow, so the key is made of plain ints: cards by value, player ids and positions complemented
+    return (specifier._value_ if specifier else 0, command) + tuple(choice._value_ if _is_card(choice) else ~choice for choice in choices)
+
+
+def _intern(key, specifier, command, choices):
+    move = object.__new__(Move)
+    for name, value in (('specifier', specifier), ('command', command), ('choices', choices), ('id', len(_moves))):
+        object.__setattr__(move, name, value)
+    _moves.append(move)
+    _moves_by_key[key] = move
+    return move
+
+
+END_TURN = Move(None, None)
+
+
+def legal_moves(player: Player, game: Game, sink: CommandsSink):
+    """ All moves the player can make now, the game and the sink are left untouched
+
+    The player and the game may be the shadows a bot gets, the sink is the one of the real game.
+    """
+    moves = []
+    for command in sink.all_possible_commands:
+        if isinstance(command, commands.InteractiveCommand):
+            for choices in command.choice_sequences(player, game):
+                moves.append(Move(command.specifier, type(command), map(_encode, choices)))
+        else:
+            moves.append(Move(command.specifier, type(command)))
+    if sink.can_end_turn:
+        moves.append(END_TURN)
+    return moves
+
+
+def apply_move(move: Move, player: Player, game: Game, sink: CommandsSink):
+    """ Execute the move via the sink, player and game are the ones legal_moves() was called with """
+    if move is END_TURN:
+        sink.end_turn()
+    else:
+        sink.execute(move.to_command(player, game, sink))
@@ -0,0 +1,47 @@
+class Pool:
+    """ Per-game free lists for recycling per-turn engine objects
+
+    Recycled commands are re-initialized by running __init__ again, so they cannot be told from new ones.
+    Objects with a reset method (turns, sinks) are reused in place and only counted here.
+    """
+
+    __slots__ = ('_free', 'allocated', 'reused')
+
+    def __init__(self):
+        self._free = {}
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, cls, *args, **kwargs):
+        """ Instance of the class, recycled if there is a free one """
+        free = self._free.get(cls)
+        if free:
+            obj = free.pop()
+            obj.__init__(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = cls(*args, **kwargs)
+            self.allocated += 1
+        return obj
+
+    def release(self, obj):
+        """ Put the object to the free list, the caller must not use it anymore """
+        free = self._free.get(type(obj))
+        if free is None:
+            free = self._free[type(obj)] = []
+        free.append(obj)
+
+    def reset(self, obj, *args):
+        """ Reuse the object in place instead of allocating a new one """
+        obj.reset(*args)
+        self.reused += 1
+        return obj
+
+    @property
+    def allocations_avoided(self):
+        """ Number of objects reused since the counters were cleared """
+        return self.reused
+
+    def clear_counters(self):
+        self.allocated = 0
+        self.reused = 0
@@ -1,36 +1,97 @@
-from citadels.cards import Character, District, DistrictInfo, all_colors
-from citadels.game import Game, Player
+from citadels.cards import Character, Color, District, DistrictInfo, char_colors, color_masks, district_bit, district_costs
+from citadels.game import CITY_SIZE, Game, Player
 from citadels import commands
 
+# cross-check incrementally kept player state against the full recomputation, slow
+check_incremental = False
 
-def possible_actions(game: Game):
+
+def _new(cls, *args, **kwargs):
+    return cls(*args, **kwargs)
+
+
+def possible_actions(game: Game, pool=None):
     """ Normal per-turn actions: MYTURN-TAKE-OR-DRAW """
-    actions = [commands.CashIn(2, source='action')]
+    make = pool.acquire if pool else _new
+    actions = [make(commands.CashIn, 2, source='action')]
     if len(game.districts) >= 2:
-        actions.append(commands.DrawSomeCards(draw=2, keep=1))
+        actions.append(make(commands.DrawSomeCards, draw=2, keep=1, deck=game.districts))
     return actions
 
 
+def _ability(cls, *args, **kwargs):
+    return cls, args, kwargs
+
+
+def _compile_ability_templates():
+    compulsory = commands.Restriction.Compulsory
+    return {
+        Character.Assassin: (_ability(commands.Kill),),
+        Character.Thief: (_ability(commands.Rob),),
+        Character.Magician: (_ability(commands.SwapHands), _ability(commands.ReplaceHand)),
+        #Character.King: (_ability(commands.TakeCrown, restriction=commands.Restriction.OnStartTurn|compulsory),), # TODO: ?
+        Character.Merchant: (_ability(commands.CashIn, 1, source='ability', restriction=commands.Restriction.OnAfterAction|compulsory),),  # MERCHANT-GOLD
+        Character.Architect: (_ability(commands.DrawCards, 2, restriction=commands.Restriction.OnAfterAction|compulsory),),  # ARCHITECT-DRAW2
+        Character.Warlord: (_ability(commands.Destroy, restriction=commands.Restriction.OnEndTurn),),
+    }
+
+
+# per-char templates of ability commands as (class, args, kwargs), compiled on first use since commands imports rules
+_ability_templates = None
+
+
 class CharacterWorkflow:
-    def __init__(self, char: Character):
-        compulsory = commands.Restriction.Compulsory
-        self.abilities = {
-            Character.Assassin: [commands.Kill()],
-            Character.Thief: [commands.Rob()],
-            Character.Magician: [commands.SwapHands(), commands.ReplaceHand()],
-            #Character.King: [commands.TakeCrown(restriction=commands.Restriction.OnStartTurn|compulsory)], # TODO: ?
-            Character.Merchant: [commands.CashIn(1, source='ability', restriction=commands.Restriction.OnAfterAction|compulsory)],  # MERCHANT-GOLD
-            Character.Architect: [commands.DrawCards(2, restriction=commands.Restriction.OnAfterAction|compulsory)],  # ARCHITECT-DRAW2
-            Character.Warlord: [commands.Destroy(restriction=commands.Restriction.OnEndTurn)],
-        }.get(char, [])
+    def __init__(self, char: Character, pool=None):
+        global _ability_templates
+        if _ability_templates is None:
+            _ability_templates = _compile_ability_templates()
+        make = pool.acquire if pool else _new
+        self.abilities = [make(cls, *args, **kwargs) for cls, args, kwargs in _ability_templates.get(char, ())]
+
+
+class EffectIndex(dict):
+    """ Effects by district, with the mask of all the indexed districts for a quick check against a city """
+
+    mask = 0
+
+
+# PURPLE: district effects are indexed per hook, so the rules visit only the districts registered for the hook
+build_effects = EffectIndex()
+destroy_effects = EffectIndex()
+income_effects = EffectIndex()
+score_effects = EffectIndex()
+
+
+def effect(index: EffectIndex, *districts):
+    """ Register decorated function as the effect of the districts in the hook index """
+    def register(func):
+        for district in districts:
+            index[district] = func
+            index.mask |= district_bit(district)
+        return func
+    return register
+
+
+def _active_effects(index: EffectIndex, player: Player):
+    """ Effects of the districts built in player's city """
+    mask = player.city_mask & index.mask
+    if not mask:
+        return ()
+    return (func for district, func in index.items() if mask & district_bit(district))
 
 
 def how_much_cost_to_build(district: District, player: Player):
-    return DistrictInfo(district).cost
+    cost = district_costs[district._value_]
+    for func in _active_effects(build_effects, player):
+        cost += func(district, player)
+    return cost
 
 
-def how_much_cost_to_destroy(district: District, player: Player):
-    return DistrictInfo(district).cost - 1
+def how_much_cost_to_destroy(district: District, owner: Player):
+    cost = district_costs[district._value_] - 1
+    for func in _active_effects(destroy_effects, owner):
+        cost += func(district, owner) or 0
+    return cost
 
 
 def how_many_districts_can_build(player: Player):
@@ -40,31 +101,61 @@ def how_many_districts_can_build(player: Player):
 
 def is_city_complete(player: Player):
     # END-BUILD8
-    return len(player.city) == 8
+    if check_incremental:
+        assert player.city_complete == (len(player.city) >= CITY_SIZE)
+    return player.city_complete
+
+
+def is_game_over(game: Game):
+    """ Some player has completed the city """
+    if check_incremental:
+        assert (game.completed_cities > 0) == any(len(player.city) >= CITY_SIZE for player in game.players)
+    return game.completed_cities > 0
 
 
 def can_be_built(district: District, player: Player):
     # BUILD-NO-DUPS
-    return district not in player.city
+    return not player.city_mask & (1 << district._value_)
 
 
 def can_be_destroyed(district: District, owner: Player):
     # BISHOP-PROTECT
-    return owner.char != Character.Bishop
+    if owner.char == Character.Bishop:
+        return False
+    return all(func(district, owner) is not None for func in _active_effects(destroy_effects, owner))
+
+
+def income(player: Player):
+    """ Gold for the districts of the color of player's char """
+    income = (player.city_mask & color_masks[char_colors[player.char or 0]]).bit_count()
+    for func in _active_effects(income_effects, player):
+        income += func(player)
+    return income
+
+
+def _check_city_state(player: Player):
+    city = player.city
+    assert player.base_score == sum(DistrictInfo(district).cost for district in city)
+    assert player.colors_mask == sum(1 << color.value for color in set(DistrictInfo(district).color for district in city))
+    assert player.city_complete == (len(city) >= CITY_SIZE)
+
+
+def _missing_colors(city_mask, colors):
+    return [color for color in colors if not city_mask & color_masks[color.value]]
 
 
 def score(player: Player, game: Game, with_bonuses=True):
+    if check_incremental:
+        _check_city_state(player)
+
     # SCORE-1
-    score = sum(DistrictInfo(district).cost for district in player.city)
+    score = player.base_score
 
     if not with_bonuses:
         return score
 
     # SCORE-2
-    built_colors = set()
-    for district in player.city:
-        built_colors.add(DistrictInfo(district).color)
-    if built_colors == set(all_colors):
+    if game.colors and player.colors_mask & game.colors_mask == game.colors_mask:
         score += 3
 
     # SCORE-3, SCORE-4
@@ -74,4 +165,64 @@ def score(player: Player, game: Game, with_bonuses=True):
         else:
             score += 2
 
+    for func in _active_effects(score_effects, player):
+        score += func(player, game)
+
     return score
+
+
+@effect(build_effects, District.Factory)
+def _factory_discount(district: District, player: Player):
+    # PURPLE-FACTORY
+    return -1 if district != District.Factory and DistrictInfo(district).color == Color.Purple else 0
+
+
+@effect(destroy_effects, District.Keep)
+def _keep_protection(district: District, owner: Player):
+    # PURPLE-KEEP: None means the district cannot be destroyed
+    return None if district == District.Keep else 0
+
+
+@effect(destroy_effects, District.GreatWall)
+def _great_wall_extra_cost(district: District, owner: Player):
+    # PURPLE-GREATWALL
+    return 0 if district == District.GreatWall else 1
+
+
+@effect(income_effects, District.MagicSchool)
+def _magic_school_income(player: Player):
+    # PURPLE-MAGICSCHOOL: counts as the color of player's char
+    return 1 if char_colors[player.char or 0] else 0
+
+
+@effect(score_effects, District.DragonGate, District.University)
+def _worth_eight(player: Player, game: Game):
+    # PURPLE-DRAGONGATE, PURPLE-UNIVERSITY
+    return 2
+
+
+@effect(score_effects, District.Treasury)
+def _treasury_bonus(player: Player, game: Game):
+    # PURPLE-TREASURY
+    return player.gold
+
+
+@effect(score_effects, District.MapRoom)
+def _map_room_bonus(player: Player, game: Game):
+    # PURPLE-MAPROOM
+    return len(player.hand)
+
+
+@effect(score_effects, District.WishingWell)
+def _wishing_well_bonus(player: Player, game: Game):
+    # PURPLE-WISHINGWELL: one point per other purple district
+    return (player.city_mask & color_masks[Color.Purple.value]).bit_count() - 1
+
+
+@effect(score_effects, District.HauntedCity)
+def _haunted_city_bonus(player: Player, game: Game):
+    # PURPLE-HAUNTEDCITY: may stand for any color to complete SCORE-2
+    if not game.colors or not _missing_colors(player.city_mask, game.colors):
+        return 0
+    missing = _missing_colors(player.city_mask & ~district_bit(District.HauntedCity), game.colors)
+    return 3 if len(missing) <= 1 else 0
@@ -1,27 +1,122 @@
-from citadels.cards import Card
+from array import array
+from itertools import repeat
+import random
+
+from citadels.cards import Color, District, DistrictDeck, district_colors, district_costs, facedown_district
 from citadels.game import Game, Player, PlayersProxy, Turn
+from citadels import zobrist
 
 
 class ShadowTurn:
     """ Read-only copy of Turn hiding all private info for passing into bot's controller """
 
-    def __init__(self, turn: Turn):
-        self.unused_chars = turn.unused_chars
-        self.killed_char = turn.killed_char
-        self.robbed_char = turn.robbed_char
-        self.first_completer = turn.first_completer
+    __slots__ = ('_unused_chars', '_killed_char', '_robbed_char', '_first_completer')
+
+    def __init__(self):
+        self._unused_chars = ()
+        self._killed_char = None
+        self._robbed_char = None
+        self._first_completer = None
+
+    def _update(self, turn: Turn, players: PlayersProxy):
+        self._unused_chars = turn.unused_chars
+        self._killed_char = turn.killed_char
+        self._robbed_char = turn.robbed_char
+        first_completer = turn.first_completer
+        self._first_completer = players.find_by_id(first_completer.player_id) if first_completer else None
+
+    @property
+    def unused_chars(self):
+        return self._unused_chars
+
+    @property
+    def killed_char(self):
+        return self._killed_char
+
+    @property
+    def robbed_char(self):
+        return self._robbed_char
+
+    @property
+    def first_completer(self):
+        return self._first_completer
 
 
 class ShadowPlayer:
-    """ Read-only copy of Player hiding all private info for passing into bot's controller """
+    """ Read-only copy of Player hiding all private info for passing into bot's controller
+
+    The copy keeps no reference to the player, update() copies the player again when the game version has changed.
+    """
+
+    __slots__ = ('_me', '_version', '_player_id', '_name', '_gold', '_hand', '_char', '_city', '_city_mask',
+                 '_base_score', '_colors_mask', '_city_complete', '_hash')
 
     def __init__(self, player: Player, me=False):
-        self.player_id = player.player_id
-        self.gold = player.gold
-        self.name = player.name
-        self.hand = [district if me else Card(district).facedown for district in player.hand]
-        self.char = player.char
-        self.city = player.city
+        self._me = me
+        self._version = None
+        self.update(player)
+
+    def update(self, player: Player):
+        """ Copy the current state of the player the shadow was made of """
+        version = player._game._version
+        if version == self._version:
+            return
+        player_id = player.player_id
+        hand = player.hand
+        self._player_id = player_id
+        self._name = player.name
+        self._gold = player.gold
+        self._hand = hand if self._me else (facedown_district,) * len(hand)
+        self._char = player.char
+        self._city = player.city
+        self._city_mask = player.city_mask
+        self._base_score = player.base_score
+        self._colors_mask = player.colors_mask
+        self._city_complete = player.city_complete
+        hand_hash = player._hand_hash if self._me else zobrist.hand_size_keys[player_id] * len(hand)
+        self._hash = (hand_hash + player._city_hash + zobrist.char_key(player_id, self._char) +
+                      zobrist.gold_keys[player_id] * self._gold)
+        self._version = version
+
+    @property
+    def player_id(self):
+        return self._player_id
+
+    @property
+    def gold(self):
+        return self._gold
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def hand(self):
+        return self._hand
+
+    @property
+    def char(self):
+        return self._char
+
+    @property
+    def city(self):
+        return self._city
+
+    @property
+    def city_mask(self):
+        return self._city_mask
+
+    @property
+    def base_score(self):
+        return self._base_score
+
+    @property
+    def colors_mask(self):
+        return self._colors_mask
+
+    @property
+    def city_complete(self):
+        return self._city_complete
 
     def __eq__(self, other):
         if not isinstance(other, ShadowPlayer) and not isinstance(other, Player):
@@ -33,15 +128,156 @@ class ShadowPlayer:
         return 'ShadowPlayer("{}")'.format(self.name)
 
 
+class ShadowDeck:
+    """ Information set copy of the district deck: its size and statistics of the cards unseen by the viewer
+
+    Cards are facedown and the order is not exposed. The unseen cards are the deck plus opponents' hands, as the deck
+    composition alone would tell what the opponents hold.
+    """
+
+    __slots__ = ('_size', '_counts', '_color_counts', '_total_cost', '_unseen', '_stamp')
+
+    def __init__(self):
+        self._stamp = None
+
+    def _update(self, viewer_id, game: Game):
+        deck = game.districts
+        stamp = (game._version, deck._hash, len(deck))
+        if stamp == self._stamp:
+            return
+        counts = array('H', deck._counts)
+        color_counts = array('H', deck._color_counts)
+        total_cost = deck._total_cost
+        unseen = len(deck)
+        for player in game.players:
+            if player.player_id == viewer_id:
+                continue
+            for district in player.hand:
+                value = district._value_
+                counts[value] += 1
+                color_counts[district_colors[value]] += 1
+                total_cost += district_costs[value]
+            unseen += len(player.hand)
+        self._size = len(deck)
+        self._counts = counts
+        self._color_counts = color_counts
+        self._total_cost = total_cost
+        self._unseen = unseen
+        self._stamp = stamp
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return repeat(facedown_district, self._size)
+
+    def __getitem__(self, item):
+        size = self._size
+        if isinstance(item, slice):
+            return [facedown_district] * len(range(*item.indices(size)))
+        if not -size <= item < size:
+            raise IndexError('deck index out of range')
+        return facedown_district
+
+    @property
+    def unseen(self):
+        """ Number of cards unseen by the viewer: the deck and opponents' hands """
+        return self._unseen
+
+    def copies(self, district: District):
+        """ Number of unseen copies of the district """
+        return self._counts[district.value]
+
+    def copies_of_color(self, color: Color):
+        """ Number of unseen districts of the color """
+        return self._color_counts[color.value]
+
+    def probability_of_color(self, color: Color):
+        """ Probability that the next card is of the color as far as the viewer knows """
+        return self._color_counts[color.value] / self._unseen if self._unseen else 0.0
+
+    @property
+    def expected_cost(self):
+        """ Expected cost of the next card as far as the viewer knows """
+        return self._total_cost / self._unseen if self._unseen else 0.0
+
+    def sample(self, rng=random):
+        """ Deck of the same size dealt at random from the unseen cards, for determinization """
+        counts = self._counts
+        unseen = [district for district in District for _ in range(counts[district.value])]
+        return DistrictDeck(rng.sample(unseen, self._size))
+
+
 class ShadowGame:
-    """ Read-only copy of Game hiding all private info for passing into bot's controller """
+    """ Read-only copy of Game hiding all private info for passing into bot's controller
+
+    The copy keeps no reference to the game or its players, update() copies the game again when it has changed.
+    Shadow players are made once per player, so the copies a bot holds stay current across updates.
+    """
+
+    __slots__ = ('_viewer_id', '_turn', '_districts', '_shadow_players', '_players', '_crowned_player', '_colors',
+                 '_colors_mask', '_version')
 
     def __init__(self, player: Player, game: Game):
-        is_me = lambda p: p == player
-        shadow_players = [ShadowPlayer(p, me=is_me(p)) for p in game.players]
+        self._viewer_id = player.player_id
+        self._turn = ShadowTurn()
+        self._districts = ShadowDeck()
+        self._shadow_players = []
+        self._players = None
+        self._crowned_player = None
+        self._colors = game.colors
+        self._colors_mask = game.colors_mask
+        self._version = None
+        self.update(game)
+
+    def update(self, game: Game):
+        """ Copy the current state of the game the shadow was made of """
+        self._districts._update(self._viewer_id, game)  # decks are not covered by the game version
+        if self._version == game._version:
+            return
+        shadow_players = self._shadow_players
+        for p in game.players[len(shadow_players):]:
+            shadow_players.append(ShadowPlayer(p, me=p.player_id == self._viewer_id))
+        for shadow_player, p in zip(shadow_players, game.players):
+            shadow_player.update(p)
         crowned_index = game.players.crowned_index
-        self.crowned_player = shadow_players[crowned_index] if crowned_index != -1 else None
-        self.players = PlayersProxy(shadow_players, self.crowned_player)
-        self.turn = ShadowTurn(game.turn)
-        #self.districts = Deck([Card(district).facedown for district in game.districts])
-        self.districts = game.districts # TODO: temporary regression
+        self._crowned_player = shadow_players[crowned_index] if crowned_index != -1 else None
+        self._players = PlayersProxy(shadow_players, self._crowned_player)
+        self._turn._update(game.turn, self._players)
+        self._version = game._version
+
+    @property
+    def players(self):
+        return self._players
+
+    @property
+    def crowned_player(self):
+        return self._crowned_player
+
+    @property
+    def turn(self):
+        return self._turn
+
+    @property
+    def colors(self):
+        return self._colors
+
+    @property
+    def colors_mask(self):
+        return self._colors_mask
+
+    @property
+    def districts(self):
+        return self._districts
+
+    @property
+    def zobrist(self):
+        """ Hash of the information set: states indistinguishable for the player hash equally """
+        h = zobrist.viewer_keys[self._viewer_id] + zobrist.turn_hash(self.turn) + \
+            zobrist.deck_size_key * len(self.districts)
+        for player in self.players:
+            h += player._hash
+        crowned_player = self.crowned_player
+        if crowned_player:
+            h += zobrist.crown_keys[crowned_player.player_id]
+        return h & zobrist.MASK
@@ -0,0 +1,55 @@
+""" Zobrist-style keys for hashing game state
+
+Features are combined by addition modulo 2**64 rather than by XOR, so that multisets (hands, deck composition)
+and counters (gold) can be updated in O(1): adding a card adds its key, removing it subtracts the key.
+"""
+import random
+
+MASK = (1 << 64) - 1
+MAX_PLAYERS = 16
+MAX_VALUE = 63  # covers District and Character values
+
+_rng = random.Random(0x2c17ade15)
+
+
+def _keys(size):
+    return [_rng.getrandbits(64) for _ in range(size)]
+
+
+def _player_keys(size):
+    return [_keys(size) for _ in range(MAX_PLAYERS + 1)]
+
+
+# tables are indexed by player_id, District.value and Character.value
+hand_keys = _player_keys(MAX_VALUE + 1)
+city_keys = _player_keys(MAX_VALUE + 1)
+char_keys = _player_keys(MAX_VALUE + 1)
+gold_keys = _keys(MAX_PLAYERS + 1)  # multiplied by the balance
+hand_size_keys = _keys(MAX_PLAYERS + 1)  # multiplied by the hand size, for hidden hands
+crown_keys = _keys(MAX_PLAYERS + 1)
+first_completer_keys = _keys(MAX_PLAYERS + 1)
+viewer_keys = _keys(MAX_PLAYERS + 1)
+deck_keys = _keys(MAX_VALUE + 1)
+deck_size_key = _rng.getrandbits(64)  # multiplied by the deck size, for hidden decks
+killed_keys = _keys(MAX_VALUE + 1)
+robbed_keys = _keys(MAX_VALUE + 1)
+unused_keys = _keys(MAX_VALUE + 1)  # index 0 stands for a facedown char
+char_deck_keys = _keys(MAX_VALUE + 1)  # composition of the characters deck
+
+
+def char_key(player_id, char):
+    return char_keys[player_id][char] if char else 0
+
+
+def turn_hash(turn):
+    """ Hash of per-turn info, works for Turn and ShadowTurn """
+    h = 0
+    for char in turn.unused_chars:
+        h += unused_keys[char or 0]
+    if turn.killed_char:
+        h += killed_keys[turn.killed_char]
+    if turn.robbed_char:
+        h += robbed_keys[turn.robbed_char]
+    if turn.first_completer:
+        h += first_completer_keys[turn.first_completer.player_id]
+    return h
@@ -7,7 +7,7 @@ from colorama import Fore, Style, init as init_colorama
 
 from ai.naive_bot import NaiveBotController
 from ai.random_bot import RandomBotController
-from citadels.cards import Card, Character, CharacterInfo, Color, District, DistrictInfo, all_chars, simple_districts, standard_chars
+from citadels.cards import Card, Character, CharacterInfo, Color, District, DistrictInfo, HiddenCard, all_chars, simple_districts, standard_chars
 from citadels import commands
 from citadels.game import Deck, Game, Player
 from citadels.gameplay import CommandsSink, GameController, PlayerController
@@ -57,7 +57,7 @@ def help_str(val):
             Color.Purple: 'P',
         }[val]
 
-    elif isinstance(val, Card):
+    elif isinstance(val, (Card, HiddenCard)):
         return '?' if not val else help_str(val)
 
     elif isinstance(val, shadow.ShadowPlayer):
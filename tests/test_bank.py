@@ -39,3 +39,51 @@ def test_no_overdraft_on_account():
     # assert
     with pytest.raises(GameError):
         account.withdraw(11)
+
+
+def test_balances_of_all_accounts():
+    # arrange
+    bank = Bank()
+    bank.account('player1').cash_in(3)
+    bank.account('player2').cash_in(7)
+    bank.account('player3').cash_in(7)
+
+    # act
+    balances = bank.balances()
+    richest = bank.richest()
+
+    # assert
+    assert balances == {'player1': 3, 'player2': 7, 'player3': 7}
+    assert richest == 'player2'
+    assert bank.balance('nobody') == 0
+
+
+def test_restore_bank_snapshot():
+    # arrange
+    bank = Bank()
+    account = bank.account('player')
+    account.cash_in(5)
+    snapshot = bank.snapshot()
+
+    # act
+    account.withdraw(2)
+    bank.account('other').cash_in(1)
+    bank.restore(snapshot)
+
+    # assert
+    assert account.balance == 5
+    assert bank.balance('other') == 0
+
+
+def test_bank_clone_is_detached():
+    # arrange
+    bank = Bank()
+    bank.account('player').cash_in(5)
+
+    # act
+    clone = bank.clone()
+    clone.account('player').withdraw(5)
+
+    # assert
+    assert bank.account('player').balance == 5
+    assert clone.account('player').balance == 0
@@ -0,0 +1,170 @@
+import threading
+
+import pytest
+
+from citadels.bus import Backpressure, EventBus
+from citadels.gameplay import GameController, GamePlayEvents
+
+from fixtures import game
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def test_event(self, value):
+        self.events.append(value)
+
+
+def test_events_are_delivered_in_order():
+    # arrange
+    recorder = Recorder()
+    bus = EventBus()
+    bus.subscribe(recorder)
+
+    # act
+    for value in range(100):
+        bus.test_event(value)
+    bus.close()
+
+    # assert
+    assert recorder.events == list(range(100))
+    assert bus.metrics()[0].delivered == 100
+
+
+def test_drop_oldest():
+    # arrange
+    recorder = Recorder()
+    bus = EventBus(capacity=3, backpressure=Backpressure.DropOldest)
+    subscription = bus.subscribe(recorder, start=False)
+
+    # act
+    for value in range(5):
+        bus.test_event(value)
+    subscription.drain()
+
+    # assert
+    assert recorder.events == [2, 3, 4]
+    assert subscription.metrics().dropped == 2
+
+
+def test_coalesce():
+    # arrange
+    class Listener:
+        def __init__(self):
+            self.events = []
+
+        def gold_changed(self, player, gold):
+            self.events.append((player, gold))
+
+    listener = Listener()
+    bus = EventBus(capacity=2, backpressure=Backpressure.Coalesce)
+    subscription = bus.subscribe(listener, start=False)
+
+    # act
+    bus.gold_changed('A', 1)
+    bus.gold_changed('B', 1)
+    bus.gold_changed('A', 2)
+    subscription.drain()
+
+    # assert
+    assert listener.events == [('A', 2), ('B', 1)]
+    assert subscription.metrics().coalesced == 1
+
+
+def test_block_waits_for_slow_listener():
+    # arrange
+    release = threading.Event()
+
+    class SlowRecorder(Recorder):
+        def test_event(self, value):
+            release.wait()
+            super().test_event(value)
+
+    recorder = SlowRecorder()
+    bus = EventBus(capacity=1, backpressure=Backpressure.Block)
+    bus.subscribe(recorder)
+
+    # act
+    producer = threading.Thread(target=lambda: [bus.test_event(value) for value in range(3)])
+    producer.start()
+    producer.join(0.1)
+    blocked = producer.is_alive()
+    release.set()
+    producer.join()
+    bus.close()
+
+    # assert
+    assert blocked
+    assert recorder.events == [0, 1, 2]
+
+
+def test_lag_metrics():
+    # arrange
+    now = 0.0
+    recorder = Recorder()
+    bus = EventBus(clock=lambda: now)
+    subscription = bus.subscribe(recorder, start=False)
+
+    # act
+    bus.test_event(1)
+    now = 2.0
+    bus.test_event(2)
+    now = 5.0
+    lagging = subscription.metrics()
+    subscription.drain()
+
+    # assert
+    assert lagging.pending == 2
+    assert lagging.lag == 5.0
+    assert subscription.metrics().max_lag == 5.0
+    assert subscription.metrics().pending == 0
+
+
+def test_noop_events_are_not_buffered(game):
+    # arrange
+    class Spectator(GamePlayEvents):
+        def __init__(self):
+            self.added = []
+
+        def player_added(self, player):
+            self.added.append(player.name)
+
+    spectator = Spectator()
+    controller = GameController(game)
+    bus = EventBus()
+    controller.add_listener(bus)
+    subscription = bus.subscribe(spectator, start=False)
+
+    # act
+    player = game.add_player('Player')
+    player.cash_in(2)
+    subscription.drain()
+
+    # assert
+    assert spectator.added == ['Player']
+    assert subscription.metrics().posted == 1
+
+
+def test_listener_errors_are_logged_and_raised(caplog):
+    # arrange
+    class Broken:
+        def test_event(self, value):
+            raise ValueError(value)
+
+    recorder = Recorder()
+    bus = EventBus()
+    bus.subscribe(Broken())
+    bus.subscribe(recorder)
+
+    # act
+    bus.test_event(1)
+    bus.test_event(2)
+    with pytest.raises(ValueError) as error:
+        bus.close()
+
+    # assert
+    assert error.value.args == (1,)
+    assert recorder.events == [1, 2]
+    assert bus.metrics()[0].errors == 2
+    assert [record.exc_info[0] for record in caplog.records] == [ValueError, ValueError]
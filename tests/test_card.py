@@ -1,6 +1,8 @@
+import copy
+
 import pytest
 
-from citadels.cards import Card
+from citadels.cards import Card, Character, CharacterInfo, Color, District, DistrictInfo, char_colors, color_masks, district_bit, district_colors, district_costs, district_muls, facedown_char, facedown_district, simple_districts
 
 
 class Payload:
@@ -64,3 +66,58 @@ def test_card_faceup_equality():
 def test_card_facedown_equality():
     assert Card(42).facedown != Card(42)
     assert Card(42).facedown == Card(43).facedown
+
+
+def test_district_info_is_shared_record():
+    # act
+    info = DistrictInfo(District.Palace)
+
+    # assert
+    assert info is DistrictInfo(District.Palace)
+    assert (info.name, info.color, info.cost, info.mul) == ('Palace', Color.Yellow, 5, 3)
+
+
+def test_district_info_parallel_arrays():
+    for district in simple_districts():
+        info = DistrictInfo(district)
+        assert district_costs[district.value] == info.cost
+        assert district_colors[district.value] == info.color.value
+        assert district_muls[district.value] == info.mul
+
+
+def test_color_masks_cover_all_districts():
+    # act
+    masks = [color_masks[color.value] for color in Color]
+
+    # assert
+    assert sum(masks) == sum(district_bit(district) for district in District)
+    assert color_masks[Color.Purple.value] & district_bit(District.DragonGate)
+    assert not color_masks[Color.Red.value] & district_bit(District.Temple)
+
+
+def test_char_info_is_shared_record():
+    # act
+    info = CharacterInfo(Character.King)
+
+    # assert
+    assert info is CharacterInfo(Character.King)
+    assert (info.name, info.color) == ('King', Color.Yellow)
+    assert char_colors[Character.King.value] == Color.Yellow.value
+    assert char_colors[Character.Thief.value] == 0
+
+
+def test_hidden_cards_are_shared():
+    # act
+    card = facedown_district
+
+    # assert
+    assert not card
+    assert card.name is None
+    assert card == facedown_district
+    assert card != District.Palace
+    assert copy.deepcopy([card])[0] is card
+
+
+def test_hidden_card_should_still_raise_on_unknown_attr():
+    with pytest.raises(AttributeError):
+        facedown_char.something
@@ -220,3 +220,33 @@ def test_income_is_taken_automatically_on_end_turn(game):
 
     # assert
     assert player.gold == 1
+
+
+def test_magic_school_counts_for_income(game):
+    # arrange
+    city = [District.Prison, District.MagicSchool]
+    player = game.add_player('Player', char=Character.Warlord, city=city)
+
+    # act
+    sink = CommandsSink(player, game)
+
+    # assert
+    assert sink.possible_income == (commands.CashIn(2),)
+
+
+def test_build_updates_destroy_ability(game):
+    # arrange
+    player = game.add_player('Player', char=Character.Warlord, hand=[District.Market])
+    game.add_player('Victim', city=[District.Manor])
+    sink = CommandsSink(player, game)
+    sink.execute(sink.possible_actions[0])
+    can_destroy = sink.possible_abilities == (commands.Destroy(),)
+
+    # act
+    build = sink.possible_builds[0]
+    build.select(District.Market)
+    sink.execute(build)
+
+    # assert
+    assert can_destroy
+    assert not sink.possible_abilities
@@ -60,6 +60,22 @@ def test_draw_some_cards_cancel_without_draw(player, game):
     assert districts == tuple(game.districts)
 
 
+def test_draw_some_cards_choices_after_cancel(player, game):
+    # arrange
+    districts = tuple(game.districts)
+    command = commands.DrawSomeCards(draw=2, keep=1)
+
+    # act
+    command.choices(player, game)
+    command.cancel(player, game)
+    choices = command.choices(player, game)
+
+    # assert
+    assert not choices
+    assert len(game.districts) + len(player.hand) == len(districts)
+    assert districts == tuple(game.districts)
+
+
 def test_draw_cards(player, game):
     # arrange
     command = commands.DrawCards(2)
@@ -127,11 +143,11 @@ def test_swap_hands(game):
     command = commands.SwapHands()
 
     # act
-    choices = command.choices(ShadowPlayer(player1, me=True), ShadowGame(player, game))
+    choices = command.choices(ShadowPlayer(player1, me=True), ShadowGame(player1, game))
     assert [p.name for p in choices] == ['Player2']
 
     command.select(player2)
-    assert not command.choices(ShadowPlayer(player1, me=True), ShadowGame(player, game))
+    assert not command.choices(ShadowPlayer(player1, me=True), ShadowGame(player1, game))
 
     command.apply(player1, game)
 
@@ -192,6 +208,23 @@ def test_destroy(game):
     assert game.districts[-1] == District.Docks
 
 
+def test_destroy_respects_keep_and_great_wall(game):
+    # arrange
+    player1 = game.add_player('Player1')
+    player1.cash_in(2)
+
+    player2 = game.add_player('Player2', city=[District.Keep, District.GreatWall, District.Prison])
+
+    command = commands.Destroy()
+    command.select(player2)
+
+    # act
+    choices = command.choices(player1, game)
+
+    # assert: Keep cannot be destroyed, Prison costs 1 + 1 for Great Wall
+    assert choices == [District.Prison]
+
+
 def test_build(game):
     # arrange
     player = game.add_player('Player1', hand=[District.Manor, District.Palace])
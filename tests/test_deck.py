@@ -1,4 +1,6 @@
-from citadels.cards import Deck
+import pytest
+
+from citadels.cards import Color, Deck, District, DistrictDeck
 
 
 def test_take_from_top():
@@ -45,3 +47,152 @@ def test_shuffle():  # TODO: it fails once in a while
     # assert
     assert deck.cards != [0, 1, 2, 3]
     assert sorted(deck.cards) == [0, 1, 2, 3]
+
+
+def test_take_random_keeps_order_of_the_rest():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+
+    # act
+    card = deck.take_random()
+
+    # assert
+    assert deck.cards == tuple(c for c in (0, 1, 2, 3) if c != card)
+
+
+def test_take():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+
+    # act
+    deck.take(2)
+
+    # assert
+    assert deck.cards == (0, 1, 3)
+    assert deck[-1] == 3
+    assert deck[1:] == [1, 3]
+
+
+def test_restore_rewinds_draws():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+    snapshot = deck.snapshot()
+
+    # act
+    deck.take_from_top()
+    deck.take_from_top()
+    deck.put_on_bottom(0)
+    deck.restore(snapshot)
+
+    # assert
+    assert deck.cards == (0, 1, 2, 3)
+
+
+def test_restore_after_growing_to_the_top():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+    snapshot = deck.snapshot()
+
+    # act
+    deck.put_on_top(4)
+    deck.put_on_top(5)
+    deck.restore(snapshot)
+
+    # assert
+    assert deck.cards == (0, 1, 2, 3)
+
+
+def test_putting_cards_back_keeps_snapshot_valid():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+    card1 = deck.take_from_top()
+    card2 = deck.take_from_top()
+    snapshot = deck.snapshot()
+
+    # act
+    deck.put_on_top(card2)
+    deck.put_on_top(card1)
+    deck.take_from_top()
+
+    # assert
+    deck.restore(snapshot)
+    assert deck.cards == (2, 3)
+
+
+def test_stale_snapshot_is_rejected():
+    # arrange
+    deck = Deck([0, 1, 2, 3])
+    deck.take_from_top()
+    snapshot = deck.snapshot()
+
+    # act
+    deck.put_on_top(4)
+
+    # assert
+    with pytest.raises(ValueError):
+        deck.restore(snapshot)
+
+
+def test_district_deck_composition():
+    # arrange
+    deck = DistrictDeck([District.Palace, District.Temple, District.Palace, District.Church])
+
+    # assert
+    assert deck.copies(District.Palace) == 2
+    assert deck.copies_of_color(Color.Blue) == 2
+    assert deck.probability_of_color(Color.Yellow) == 0.5
+    assert deck.expected_cost == (5 + 1 + 5 + 2) / 4
+
+
+def test_district_deck_counters_follow_takes_and_puts():
+    # arrange
+    deck = DistrictDeck([District.Palace, District.Temple, District.Church])
+
+    # act
+    card = deck.take_from_top()
+    deck.put_on_bottom(District.Watchtower)
+    deck.take(District.Church)
+
+    # assert
+    assert card == District.Palace
+    assert deck.cards == (District.Temple, District.Watchtower)
+    assert deck.copies(District.Palace) == 0
+    assert deck.copies_of_color(Color.Red) == 1
+    assert deck.expected_cost == (1 + 1) / 2
+
+
+def test_district_deck_counters_follow_restore():
+    # arrange
+    deck = DistrictDeck([District.Palace, District.Temple, District.Church])
+    snapshot = deck.snapshot()
+    deck.take_from_top()
+    deck.put_on_bottom(District.Palace)
+    deck.take_from_top()
+
+    # act
+    deck.restore(snapshot)
+
+    # assert
+    assert deck.cards == (District.Palace, District.Temple, District.Church)
+    assert deck.copies(District.Palace) == 1
+    assert deck.copies_of_color(Color.Blue) == 2
+
+
+def test_district_deck_refill_from_template():
+    # arrange
+    template = DistrictDeck([District.Palace, District.Temple, District.Church])
+    deck = template.clone()
+    deck.take_from_top()
+    deck.take(District.Church)
+    snapshot = deck.snapshot()
+
+    # act
+    deck.refill(template)
+
+    # assert
+    assert deck.cards == template.cards
+    assert deck.copies(District.Palace) == 1
+    assert deck.copies_of_color(Color.Blue) == 2
+    assert deck.zobrist == template.zobrist
+    with pytest.raises(ValueError):
+        deck.restore(snapshot)
@@ -1,6 +1,6 @@
 from unittest.mock import Mock
 
-from citadels.event import EventSource, EventTransaction
+from citadels.event import EventSource, EventTransaction, noop
 
 
 def test_fire_event():
@@ -47,3 +47,126 @@ def test_transaction():
     # assert
     assert not listener.test_event.called
     assert listener.super_event.called
+
+
+def test_noop_handlers_are_skipped():
+    # arrange
+    class Listener:
+        @noop
+        def test_event(self):
+            raise AssertionError('noop handler called')
+
+    class ActiveListener(Listener):
+        def test_event(self):
+            self.called = True
+
+    source = EventSource()
+    listener = Listener()
+    active_listener = ActiveListener()
+    source.add_listener(listener)
+    source.add_listener(active_listener)
+
+    # act
+    source.fire_event('test_event')
+
+    # assert
+    assert active_listener.called
+
+
+def test_listener_added_after_fire():
+    # arrange
+    source = EventSource()
+    listener1 = Mock()
+    listener2 = Mock()
+    source.add_listener(listener1)
+    source.fire_event('test_event')
+
+    # act
+    source.add_listener(listener2)
+    source.fire_event('test_event')
+
+    # assert
+    assert listener1.test_event.call_count == 2
+    assert listener2.test_event.call_count == 1
+
+
+class BatchRecorder:
+    def __init__(self):
+        self.batches = []
+
+    def event_batch(self, events):
+        self.batches.append([event for event, _, _ in events])
+
+
+def test_batched_transaction():
+    # arrange
+    source = EventSource()
+    listener = Mock()
+    batch_listener = BatchRecorder()
+    source.add_listener(listener)
+    source.add_listener(batch_listener, batched=True)
+
+    # act
+    with EventTransaction(source, 'super_event'):
+        source.fire_event('test_event', 1)
+        source.fire_event('test_event', 2)
+
+    # assert
+    assert batch_listener.batches == [['test_event', 'test_event', 'super_event']]
+    assert not listener.test_event.called
+    assert listener.super_event.call_count == 1
+
+
+def test_batched_listener_outside_transaction():
+    # arrange
+    source = EventSource()
+    batch_listener = BatchRecorder()
+    source.add_listener(batch_listener, batched=True)
+
+    # act
+    source.fire_event('test_event')
+
+    # assert
+    assert batch_listener.batches == [['test_event']]
+
+
+def test_nested_transaction_rollback():
+    # arrange
+    source = EventSource()
+    batch_listener = BatchRecorder()
+    source.add_listener(batch_listener, batched=True)
+
+    # act
+    with EventTransaction(source, 'outer_event'):
+        source.fire_event('kept_event')
+        with EventTransaction(source, 'inner_event'):
+            source.fire_event('nested_event')
+        try:
+            with EventTransaction(source, 'failed_event'):
+                source.fire_event('discarded_event')
+                raise ValueError()
+        except ValueError:
+            pass
+
+    # assert
+    assert batch_listener.batches == [['kept_event', 'nested_event', 'inner_event', 'outer_event']]
+
+
+def test_transaction_rollback():
+    # arrange
+    source = EventSource()
+    listener = Mock()
+    source.add_listener(listener)
+
+    # act
+    try:
+        with EventTransaction(source, 'super_event'):
+            source.fire_event('test_event')
+            raise ValueError()
+    except ValueError:
+        pass
+    source.fire_event('test_event')
+
+    # assert
+    assert not listener.super_event.called
+    assert listener.test_event.call_count == 1
@@ -1,6 +1,10 @@
-from citadels.cards import Character
+from unittest.mock import Mock
+
+from citadels.cards import Character, District, district_bit
 from citadels.game import Deck, Game
 
+from fixtures import game
+
 
 def test_players_char_selection_order():
     # arrange
@@ -31,3 +35,135 @@ def test_players_take_turn_order():
 
     # assert: CROWN
     assert game.players.order_by_take_turn() == (player3, player2, player1)
+
+
+def test_clone_is_detached(game):
+    # arrange
+    player1 = game.add_player('Player1', hand=[District.Palace], city=[District.Temple])
+    player2 = game.add_player('Player2')
+    player1.cash_in(3)
+    game.crowned_player = player2
+    listener = Mock()
+    game.add_listener(listener)
+    player1.add_listener(listener)
+
+    # act
+    clone = game.clone()
+    clone_player1 = clone.players.find_by_id(player1.player_id)
+    clone_player1.take_card(District.Manor)
+    clone_player1.build_district(District.Palace)
+    clone_player1.withdraw(2)
+    clone.districts.take_from_top()
+
+    # assert
+    assert clone.crowned_player.player_id == player2.player_id
+    assert clone_player1.hand == (District.Palace, District.Manor)
+    assert clone_player1.city == (District.Temple, District.Palace)
+    assert clone_player1.gold == 1
+    assert player1.hand == (District.Palace,)
+    assert player1.city == (District.Temple,)
+    assert player1.gold == 3
+    assert len(clone.districts) == len(game.districts) - 1
+    assert not listener.taken_card.called
+
+
+def test_clone_continues_random_stream(game):
+    # act
+    clone = game.clone()
+
+    # assert
+    assert clone.rng.random() == game.rng.random()
+
+
+def test_hand_and_city_are_cached_until_changed(game):
+    # arrange
+    player = game.add_player('Player')
+    player.take_card(District.Palace)
+    hand = player.hand
+    city = player.city
+
+    # act
+    player.build_district(District.Temple)
+
+    # assert
+    assert player.hand is hand
+    assert player.city is not city
+    assert player.city == (District.Temple,)
+
+
+def test_city_mask_follows_city(game):
+    # arrange
+    player = game.add_player('Player', city=[District.Temple])
+    game.enable_journal()
+    mark = game.mark()
+
+    # act
+    player.build_district(District.Watchtower)
+    player.destroy_district(District.Temple)
+    built = player.city_mask
+    game.rollback(mark)
+
+    # assert
+    assert built == district_bit(District.Watchtower)
+    assert player.city_mask == district_bit(District.Temple)
+
+
+def test_players_orders_follow_changes(game):
+    # arrange
+    player1 = game.add_player('Player1', char=Character.King)
+    player2 = game.add_player('Player2', char=Character.Thief)
+    game.crowned_player = player1
+    orders = game.players.order_by_take_turn(), game.players.order_by_char_selection()
+
+    # act
+    player1.char = Character.Assassin
+    game.crowned_player = player2
+
+    # assert
+    assert game.players is game.players
+    assert orders == ((player2, player1), (player1, player2))
+    assert game.players.order_by_take_turn() == (player1, player2)
+    assert game.players.order_by_char_selection() == (player2, player1)
+    assert game.players.find_by_char(Character.Assassin) is player1
+    assert game.players.find_by_char(Character.King) is None
+
+
+def test_players_lookups_survive_rollback_and_clone(game):
+    # arrange
+    player1 = game.add_player('Player1', char=Character.King)
+    player2 = game.add_player('Player2')
+    game.crowned_player = player1
+    game.enable_journal()
+    mark = game.mark()
+    player1.char = Character.Thief
+    game.crowned_player = player2
+    game.players.find_by_char(Character.Thief)
+
+    # act
+    game.rollback(mark)
+    clone = game.clone()
+    clone.players[1].char = Character.Warlord
+
+    # assert
+    assert game.players.find_by_char(Character.King) is player1
+    assert game.players.crowned_index == 0
+    assert clone.players.find_by_char(Character.Warlord) is clone.players[1]
+    assert clone.players.find_by_name('Player2') is clone.players[1]
+    assert game.players.find_by_char(Character.Warlord) is None
+
+
+def test_players_find_by_name_miss_keeps_index(game):
+    # arrange
+    player1 = game.add_player('Player1')
+    game.players.find_by_name('Player1')
+    index = game.players._by_name
+
+    # act
+    missing = game.players.find_by_name('Nobody')
+
+    # assert
+    assert missing is None
+    assert game.players._by_name is index
+    player2 = game.add_player('Nobody')
+    assert game.players.find_by_name('Nobody') is player2
+    assert game.players.find_by_name('Player1') is player1
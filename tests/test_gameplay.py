@@ -1,7 +1,11 @@
+import random
+from types import BuiltinMethodType, FunctionType, MethodType, ModuleType
+
 import pytest
 
-from citadels.cards import Character
-from citadels.game import Deck, Game, Player
+from ai.naive_bot import NaiveBotController
+from citadels.cards import Character, simple_districts, standard_chars
+from citadels.game import Bank, Deck, Game, Player, Turn
 from citadels.gameplay import CommandsSink, GameController, GamePlayConfig, PlayerController
 
 from fixtures import game
@@ -23,13 +27,16 @@ class SpyPlayerController:
         self.game = None
         self.possible_actions = None
         self.possible_chars = None
+        self.received = []  # everything but the sinks
 
     def pick_char(self, char_deck: Deck, player: Player, game: Game):
         self.possible_chars = char_deck.cards
+        self.received.extend((char_deck, player, game))
         return char_deck.cards[0]
 
     def take_turn(self, player: Player, game: Game, sink: CommandsSink):
         self.game = game
+        self.received.extend((player, game))
         if not self.possible_actions:
             self.possible_actions = list(sink.possible_actions)
         if sink.possible_actions:
@@ -120,7 +127,6 @@ def test_take_turns(game):
     assert len(spy_controller.possible_actions) == 2
 
 
-@pytest.mark.skip(reason="shadowing is temporarily down")
 def test_privates_are_not_exposed_to_bot(game):
     # arrange
     player1 = game.add_player('Player1')
@@ -148,6 +154,61 @@ def test_privates_are_not_exposed_to_bot(game):
     assert not hasattr(another_player, 'game')
 
 
+def reachable(*roots):
+    """ Objects reachable from the roots through containers and instance attributes, private ones included """
+    found = {}
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in found or isinstance(obj, (type, ModuleType, str, bytes, int, float)) or obj is None:
+            continue
+        found[id(obj)] = obj
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (tuple, list, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (MethodType, BuiltinMethodType)):
+            stack.append(obj.__self__)
+        elif isinstance(obj, FunctionType):
+            stack.extend(cell.cell_contents for cell in obj.__closure__ or ())
+        for cls in type(obj).__mro__:
+            slots = getattr(cls, '__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+        attrs = getattr(obj, '__dict__', None)
+        if isinstance(attrs, dict):
+            stack.extend(attrs.values())
+    return list(found.values())
+
+
+def test_live_objects_are_not_reachable_by_bot(game):
+    # arrange
+    player1 = game.add_player('Player1')
+    player2 = game.add_player('Player2')
+
+    game_controller = GameController(game)
+    spy_controller = SpyPlayerController()
+    game_controller.set_player_controller(player1, spy_controller)
+    game_controller.set_player_controller(player2, DummyPlayerController())
+
+    game_controller.start_game()
+    game_controller.start_turn()
+
+    # act
+    game_controller.take_turns()
+    game_controller.end_turn()
+    game_controller.start_turn()
+    game_controller.take_turns()
+
+    # assert
+    received = reachable(*spy_controller.received)
+    assert any(isinstance(obj, Player) for obj in reachable(game))
+    assert not [obj for obj in received if isinstance(obj, (Player, Game, Turn, Bank))]
+    assert not [obj for obj in received if obj is game.characters or obj is game.districts]
+
+
 def test_killed_char_misses_turn(game):
     # arrange
     assassing = game.add_player('Player1')
@@ -198,3 +259,19 @@ def test_thief_takes_gold_from_robbed_char(game):
     turn_income = 2
     assert thief.gold == thief_gold + victim_gold + turn_income
     assert victim.gold == turn_income
+
+
+def test_seeded_game_is_reproducible():
+    def play(seed):
+        game = Game(Deck(standard_chars()), Deck(simple_districts()), rng=random.Random(seed))
+        game_controller = GameController(game)
+        for i in range(3):
+            player = game.add_player('Player{}'.format(i + 1))
+            game_controller.set_player_controller(player, NaiveBotController(rng=random.Random(seed + i)))
+
+        while not game_controller.game_over:
+            game_controller.play()
+        return [(player.city, player.hand, player.gold) for player in game.players]
+
+    # assert
+    assert play(42) == play(42)
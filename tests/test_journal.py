@@ -0,0 +1,132 @@
+import random
+
+from ai.naive_bot import NaiveBotController
+from citadels.cards import Character, Deck, District, DistrictDeck, simple_districts, standard_chars
+from citadels import commands
+from citadels.game import Game
+from citadels.gameplay import GameController
+from citadels.journal import Journal
+
+from fixtures import game, player
+
+
+def state(game):
+    players = tuple((p.char, p.hand, p.city, p.gold) for p in game.players)
+    turn = (game.turn.unused_chars, game.turn.killed_char, game.turn.robbed_char, game.turn.first_completer)
+    chars = game.characters.cards if game.characters else None
+    return players, turn, game.crowned_player, game.districts.cards, chars
+
+
+def test_rollback_player_changes(game, player):
+    # arrange
+    game.enable_journal()
+    player.take_card(District.Palace)
+    player.cash_in(5)
+    before = state(game)
+    mark = game.mark()
+
+    # act
+    player.take_card(District.Temple)
+    player.remove_card(District.Palace)
+    player.build_district(District.Temple)
+    player.withdraw(3)
+    player.char = Character.King
+    game.crowned_player = player
+    game.rollback(mark)
+
+    # assert
+    assert state(game) == before
+
+
+def test_rollback_deck_moves(game, player):
+    # arrange
+    game.enable_journal()
+    before = state(game)
+    mark = game.mark()
+
+    # act
+    game.districts.put_on_top(game.districts.take_from_top())
+    game.districts.put_on_bottom(game.districts.take_from_top())
+    game.districts.take(District.Palace)
+    game.districts.shuffle()
+    game.rollback(mark)
+
+    # assert
+    assert state(game) == before
+    assert game.districts.copies(District.Palace) == 3
+
+
+def test_draw_some_cards_cancel_is_journaled(game, player):
+    # arrange
+    game.enable_journal()
+    before = state(game)
+    mark = game.mark()
+
+    command = commands.DrawSomeCards(draw=2, keep=1)
+    command.select(command.choices(player, game)[0])
+    command.cancel(player, game)
+
+    # act
+    game.rollback(mark)
+
+    # assert
+    assert state(game) == before
+
+
+def test_rollback_restore_then_put_on_top():
+    # arrange
+    deck = DistrictDeck([District.Manor, District.Temple])
+    deck._journal = Journal()
+    snapshot = deck.snapshot()
+    mark = deck._journal.mark()
+
+    # act
+    deck.restore(snapshot)
+    deck.put_on_top(District.Castle)  # grows the front, shifting the slots
+    deck._journal.rollback(mark)
+
+    # assert
+    assert deck.cards == (District.Manor, District.Temple)
+
+
+def test_clone_of_journaled_game_is_not_journaled(game):
+    # arrange
+    game.enable_journal()
+    mark = game.mark()
+    clone = game.clone()
+    size = len(clone.districts)
+
+    # act
+    clone.districts.take_from_top()
+    game.rollback(mark)
+
+    # assert
+    assert len(clone.districts) == size - 1
+    assert clone.journal is None
+
+
+def test_rollback_whole_game():
+    # arrange
+    game = Game(Deck(standard_chars()), Deck(simple_districts()), rng=random.Random(7))
+    game_controller = GameController(game)
+    for i in range(4):
+        player = game.add_player('Player{}'.format(i + 1))
+        game_controller.set_player_controller(player, NaiveBotController(rng=random.Random(i)))
+    game_controller.start_game()
+
+    game.enable_journal()
+    marks = []
+    states = []
+
+    # act
+    for _ in range(3):
+        marks.append(game.mark())
+        states.append(state(game))
+        game_controller.start_turn()
+        game_controller.take_turns()
+        game_controller.end_turn()
+
+    # assert
+    for mark, expected in reversed(list(zip(marks, states))):
+        game.rollback(mark)
+        assert state(game) == expected
@@ -0,0 +1,198 @@
+import pickle
+
+import pytest
+
+from citadels.cards import Character, District
+from citadels import commands
+from citadels.gameplay import CommandSpecifier, CommandsSink
+from citadels.moves import END_TURN, Move, apply_move, legal_moves
+from citadels.shadow import ShadowGame, ShadowPlayer
+
+from fixtures import game
+
+
+def test_assassin_moves(game):
+    # arrange
+    player = game.add_player('Player', char=Character.Assassin)
+
+    # act
+    moves = legal_moves(player, game, CommandsSink(player, game))
+
+    # assert
+    kills = [move for move in moves if move.command is commands.Kill]
+    assert len(kills) == 7
+    assert Move(CommandSpecifier.Ability, commands.Kill, (Character.Merchant,)) in kills
+    assert END_TURN not in moves
+
+
+def test_destroy_moves(game):
+    # arrange
+    warlord = game.add_player('Warlord', char=Character.Warlord, city=[District.Watchtower])
+    victim = game.add_player('Victim', city=[District.Manor, District.Manor, District.Palace])
+    sink = CommandsSink(warlord, game)
+    sink.execute(sink.possible_actions[0])
+
+    # act
+    moves = legal_moves(warlord, game, sink)
+
+    # assert
+    destroys = [move.choices for move in moves if move.command is commands.Destroy]
+    assert destroys == [(warlord.player_id, District.Watchtower), (victim.player_id, District.Manor)]
+
+
+def test_draw_some_cards_moves_do_not_touch_deck(game):
+    # arrange
+    player = game.add_player('Player', char=Character.King)
+    top = game.districts[:2]
+    size = len(game.districts)
+
+    # act
+    moves = legal_moves(player, game, CommandsSink(player, game))
+
+    # assert
+    draws = [move.choices for move in moves if move.command is commands.DrawSomeCards]
+    assert draws == [(0,), (1,)]
+    assert game.districts[:2] == top
+    assert len(game.districts) == size
+
+
+def test_apply_move(game):
+    # arrange
+    player = game.add_player('Player', char=Character.King)
+    sink = CommandsSink(player, game)
+    top = game.districts[0]
+    move = Move(CommandSpecifier.Action, commands.DrawSomeCards, (0,))
+
+    # act
+    apply_move(move, player, game, sink)
+
+    # assert
+    assert player.hand == (top,)
+    assert END_TURN in legal_moves(player, game, sink)
+
+
+def test_apply_every_move_of_a_turn(game):
+    # arrange
+    assassin = game.add_player('Assassin', char=Character.Assassin)
+    sink = CommandsSink(assassin, game)
+
+    # act
+    while not sink.done:
+        move = legal_moves(assassin, game, sink)[0]
+        apply_move(move, assassin, game, sink)
+        if move is END_TURN:
+            break
+
+    # assert
+    assert game.turn.killed_char == Character.Thief
+    assert assassin.gold == 2
+
+
+def test_shadow_moves_match_real_moves(game):
+    # arrange
+    player = game.add_player('Player', char=Character.Assassin)
+    game.add_player('Other')
+    sink = CommandsSink(player, game)
+
+    # act
+    moves = legal_moves(ShadowPlayer(player, me=True), ShadowGame(player, game), sink)
+
+    # assert
+    assert [move for move in moves if move.command is commands.Kill] == \
+        [move for move in legal_moves(player, game, sink) if move.command is commands.Kill]
+    assert len(moves) == 10  # 7 kills, cash in and 2 blind draw positions
+
+
+def test_moves_are_interned():
+    # act
+    move1 = Move(CommandSpecifier.Ability, commands.Kill, (Character.Merchant,))
+    move2 = Move(CommandSpecifier.Ability, commands.Kill, [Character.Merchant])
+
+    # assert
+    assert move1 is move2
+    assert hash(move1) == move1.id
+    assert Move.by_id(move1.id) is move1
+    assert Move(CommandSpecifier.Ability, commands.Rob, (Character.Merchant,)) is not move1
+
+
+def test_moves_are_immutable():
+    # arrange
+    move = Move(CommandSpecifier.Ability, commands.Kill, (Character.Merchant,))
+
+    # act
+    with pytest.raises(AttributeError):
+        move.choices = (Character.King,)
+
+    # assert
+    assert move.choices == (Character.Merchant,)
+
+
+def test_pickled_move_is_interned():
+    # arrange
+    move = Move(CommandSpecifier.Ability, commands.Destroy, (1, District.Palace))
+
+    # act
+    restored = pickle.loads(pickle.dumps(move))
+
+    # assert
+    assert restored is move
+
+
+def test_move_from_and_to_command(game):
+    # arrange
+    thief = game.add_player('Thief', char=Character.Thief)
+    sink = CommandsSink(thief, game)
+    rob = sink.possible_abilities[0]
+    move = Move(CommandSpecifier.Ability, commands.Rob, (Character.King,))
+
+    # act
+    command = move.to_command(thief, game, sink)
+
+    # assert
+    assert command is rob
+    assert command == commands.Rob(Character.King)
+    assert Move.from_command(command) is move
+
+
+def test_blind_draw_moves_from_shadow_game(game):
+    # arrange
+    player = game.add_player('Player', char=Character.King)
+    sink = CommandsSink(player, game)
+    shadow_player, shadow_game = ShadowPlayer(player, me=True), ShadowGame(player, game)
+    second = game.districts[1]
+
+    # act
+    draws = [move for move in legal_moves(shadow_player, shadow_game, sink) if move.command is commands.DrawSomeCards]
+    apply_move(draws[1], shadow_player, shadow_game, sink)
+
+    # assert
+    assert [move.choices for move in draws] == [(0,), (1,)]
+    assert player.hand == (second,)
+
+
+@pytest.mark.parametrize('shadowed', [False, True])
+def test_executed_move_converts_back_to_itself(game, shadowed):
+    # arrange
+    player = game.add_player('Player', char=Character.Assassin)
+    game.add_player('Other')
+    game.districts.put_on_top(District.Temple)
+    game.districts.put_on_top(District.Temple)  # equal cards are still told apart by position
+    sink = CommandsSink(player, game)
+    view = (ShadowPlayer(player, me=True), ShadowGame(player, game)) if shadowed else (player, game)
+    kill = [move for move in legal_moves(*view, sink) if move.command is commands.Kill][-1]
+
+    def execute(move):
+        command = move.to_command(*view, sink)
+        sink.execute(command)
+        return Move.from_command(command)
+
+    # act
+    killed = execute(kill)
+    draw = [move for move in legal_moves(*view, sink) if move.command is commands.DrawSomeCards][1]
+    drawn = execute(draw)
+
+    # assert
+    assert killed is kill
+    assert drawn is draw
+    assert draw.choices == (1,)
+    assert player.hand == (District.Temple,)
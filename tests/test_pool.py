@@ -0,0 +1,115 @@
+import pytest
+
+from citadels.cards import Character, District
+from citadels import commands
+from citadels.game import GameError
+from citadels.gameplay import CommandsSink
+from citadels.pool import Pool
+
+from fixtures import game
+
+
+def test_released_command_is_reinitialized():
+    # arrange
+    pool = Pool()
+    command = pool.acquire(commands.Kill)
+    command.select(Character.King)
+    pool.release(command)
+
+    # act
+    recycled = pool.acquire(commands.Kill)
+
+    # assert
+    assert recycled is command
+    assert not recycled.ready
+    assert (pool.allocated, pool.allocations_avoided) == (1, 1)
+
+
+def test_sink_reset_recycles_commands(game):
+    # arrange
+    player1 = game.add_player('Player1', char=Character.Assassin)
+    player2 = game.add_player('Player2', char=Character.Warlord, city=[District.Watchtower])
+    sink = CommandsSink(player1, game)
+    sink.execute(sink.possible_actions[0])
+    avoided = game.pool.allocations_avoided
+
+    # act
+    game.pool.reset(sink, player2)
+
+    # assert
+    assert game.pool.allocations_avoided > avoided + 1
+    assert sink.possible_actions == (commands.CashIn(2), commands.DrawSomeCards(draw=2, keep=1))
+    assert sink.possible_income == (commands.CashIn(1),)
+    assert not sink.possible_abilities
+
+
+def test_turn_reset_is_journaled(game):
+    # arrange
+    game.turn.drop_char(Character.King)
+    game.turn.killed_char = Character.Thief
+    turn = game.turn
+    game.enable_journal()
+    mark = game.mark()
+
+    # act
+    game.new_turn()
+    reset = game.turn.unused_chars, game.turn.killed_char
+    game.rollback(mark)
+
+    # assert
+    assert game.turn is turn
+    assert reset == ((), None)
+    assert (game.turn.unused_chars, game.turn.killed_char) == ((Character.King,), Character.Thief)
+
+
+def test_executed_commands_are_kept_until_reset(game):
+    # arrange
+    player1 = game.add_player('Player1', char=Character.Assassin)
+    player2 = game.add_player('Player2', char=Character.Warlord)
+    sink = CommandsSink(player1, game)
+    kill = sink.possible_abilities[0]
+    kill.select(Character.King)
+
+    # act
+    sink.execute(kill)
+    sink.update()
+    kept = kill.selected, kill.released
+    game.pool.reset(sink, player2)
+
+    # assert
+    assert kept == ((Character.King,), False)
+    assert kill.released
+    with pytest.raises(GameError):
+        kill.apply(player1, game)
+
+
+def test_dropped_commands_are_released(game):
+    # arrange
+    player = game.add_player('Player', char=Character.King)
+    sink = CommandsSink(player, game)
+    take_gold, draw_cards = sink.possible_actions
+
+    # act
+    sink.execute(take_gold)
+
+    # assert
+    assert not take_gold.released
+    assert draw_cards.released
+    with pytest.raises(GameError):
+        draw_cards.choices(player, game)
+
+
+def test_sink_updates_recycle_dropped_commands(game):
+    # arrange
+    player = game.add_player('Player', char=Character.Warlord, city=[District.Watchtower])
+    sink = CommandsSink(player, game)
+    sink.update()
+    allocated = game.pool.allocated
+
+    # act
+    for _ in range(10):
+        sink.update()
+
+    # assert
+    assert game.pool.allocated == allocated
+    assert sink.possible_actions == (commands.CashIn(2), commands.DrawSomeCards(draw=2, keep=1))
@@ -1,4 +1,8 @@
-from citadels.cards import District
+import random
+
+from ai.naive_bot import NaiveBotController
+from citadels.cards import Deck, District, simple_districts, standard_chars
+from citadels.game import Game
 from citadels.gameplay import GameController
 from citadels import rules
 
@@ -109,3 +113,88 @@ def test_winner_with_most_gold_if_double_tie(game):
 
     # assert
     assert winner == player2
+
+
+def test_dragon_gate_is_worth_eight(game):
+    # arrange
+    player = game.add_player('Player', city=[District.DragonGate])
+
+    # act
+    score = rules.score(player, game)
+
+    # assert
+    assert score == 8
+
+
+def test_haunted_city_completes_colors(game):
+    # arrange
+    player = game.add_player('Player', city=[District.Watchtower, District.Tavern, District.Temple, District.HauntedCity])
+
+    # act
+    score = rules.score(player, game)
+
+    # assert
+    bonus = 3
+    assert score == 1 + 1 + 1 + 2 + bonus
+
+
+def test_haunted_city_bonus_is_given_once(game):
+    # arrange
+    complete = game.add_player('Complete', city=[District.Watchtower, District.Tavern, District.Temple, District.Manor, District.HauntedCity])
+    short = game.add_player('Short', city=[District.Watchtower, District.Tavern, District.HauntedCity])
+
+    # act
+    complete_score = rules.score(complete, game)
+    short_score = rules.score(short, game)
+
+    # assert
+    bonus = 3
+    assert complete_score == 1 + 1 + 1 + 3 + 2 + bonus
+    assert short_score == 1 + 1 + 2
+
+
+def test_map_room_scores_hand(game):
+    # arrange
+    player = game.add_player('Player', hand=[District.Tavern, District.Temple], city=[District.MapRoom])
+
+    # act
+    score = rules.score(player, game)
+
+    # assert
+    assert score == 5 + 2
+
+
+def test_city_state_follows_builds_and_losses(game):
+    # arrange
+    player = game.add_player('Player', city=[District.Watchtower, District.Tavern, District.Temple, District.Manor,
+                                             District.Prison, District.Market, District.Church])
+
+    # act
+    player.build_district(District.Palace)
+    complete = player.city_complete, game.completed_cities
+    player.destroy_district(District.Watchtower)
+
+    # assert
+    assert complete == (True, 1)
+    assert (player.city_complete, game.completed_cities) == (False, 0)
+    assert player.base_score == 1 + 1 + 3 + 2 + 2 + 2 + 5
+    assert rules.score(player, game) == player.base_score + 3
+
+
+def test_incremental_state_matches_recomputation(monkeypatch):
+    # arrange
+    monkeypatch.setattr(rules, 'check_incremental', True)
+    game = Game(Deck(standard_chars()), Deck(simple_districts()), rng=random.Random(3))
+    game_controller = GameController(game)
+    for i in range(4):
+        player = game.add_player('Player{}'.format(i + 1))
+        game_controller.set_player_controller(player, NaiveBotController(rng=random.Random(i)))
+
+    # act
+    while not game_controller.game_over:
+        game_controller.play()
+        for player in game.players:
+            rules.score(player, game)
+
+    # assert
+    assert game_controller.winner
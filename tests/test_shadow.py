@@ -0,0 +1,104 @@
+import random
+
+from citadels.cards import District, facedown_district
+from citadels.shadow import ShadowGame, ShadowPlayer
+
+from fixtures import game
+
+
+def test_game_version_changes_on_mutation(game):
+    # arrange
+    player = game.add_player('Player')
+    version = game.version
+
+    # act
+    player.take_card(District.Temple)
+
+    # assert
+    assert game.version != version
+
+
+def test_shadow_follows_game_on_update(game):
+    # arrange
+    me = game.add_player('Me')
+    other = game.add_player('Other')
+    shadow_game = ShadowGame(me, game)
+    shadow_me = ShadowPlayer(me, me=True)
+    shadow_other = shadow_game.players.find_by_id(other.player_id)
+
+    # act
+    me.cash_in(3)
+    me.take_card(District.Temple)
+    other.take_card(District.Palace)
+    game.crowned_player = other
+    stale_gold = shadow_me.gold
+    shadow_me.update(me)
+    shadow_game.update(game)
+
+    # assert
+    assert stale_gold == 0
+    assert shadow_me.gold == 3
+    assert shadow_me.hand == (District.Temple,)
+    assert shadow_other.hand == (facedown_district,)
+    assert shadow_game.crowned_player.name == 'Other'
+
+
+def test_opponent_hand_stays_hidden_after_change(game):
+    # arrange
+    me = game.add_player('Me')
+    other = game.add_player('Other', hand=[District.Temple])
+    shadow_game = ShadowGame(me, game)
+    shadow_other = shadow_game.players.find_by_name('Other')
+    assert shadow_other.hand == (facedown_district,)
+
+    # act
+    other.take_card(District.Palace)
+    shadow_game.update(game)
+
+    # assert
+    assert shadow_other.hand == (facedown_district, facedown_district)
+    assert not any(bool(district) for district in shadow_other.hand)
+
+
+def test_shadow_deck_hides_cards(game):
+    # arrange
+    me = game.add_player('Me')
+    shadow_deck = ShadowGame(me, game).districts
+
+    # assert
+    assert len(shadow_deck) == len(game.districts)
+    assert not any(bool(district) for district in shadow_deck)
+    assert shadow_deck[:2] == [facedown_district, facedown_district]
+    assert not shadow_deck[0]
+
+
+def test_shadow_deck_counts_opponents_hands_as_unseen(game):
+    # arrange
+    me = game.add_player('Me', hand=[District.Palace])
+    game.add_player('Other', hand=[District.Temple])
+    shadow_game = ShadowGame(me, game)
+    shadow_deck = shadow_game.districts
+    copies = game.districts.copies(District.Temple)
+
+    # act
+    game.districts.take(District.Temple)
+    shadow_game.update(game)
+
+    # assert
+    assert shadow_deck.unseen == len(game.districts) + 1
+    assert shadow_deck.copies(District.Temple) == copies  # one left the deck but the other is still unseen
+    assert shadow_deck.copies(District.Palace) == game.districts.copies(District.Palace)
+
+
+def test_shadow_deck_sample(game):
+    # arrange
+    me = game.add_player('Me')
+    game.add_player('Other', hand=[District.Temple])
+    shadow_deck = ShadowGame(me, game).districts
+
+    # act
+    deck = shadow_deck.sample(random.Random(1))
+
+    # assert
+    assert len(deck) == len(game.districts)
+    assert all(deck.copies(district) <= shadow_deck.copies(district) for district in District)
@@ -0,0 +1,146 @@
+import random
+
+from ai.naive_bot import NaiveBotController
+from citadels.cards import Character, Deck, District, facedown_char, simple_districts, standard_chars
+from citadels.game import Game
+from citadels.gameplay import GameController
+from citadels.shadow import ShadowGame
+from citadels import zobrist
+
+from fixtures import game, player, player1, player2
+
+
+def play_game(seed):
+    game = Game(Deck(standard_chars()), Deck(simple_districts()), rng=random.Random(seed))
+    game_controller = GameController(game)
+    for i in range(3):
+        player = game.add_player('Player{}'.format(i + 1))
+        game_controller.set_player_controller(player, NaiveBotController(rng=random.Random(i)))
+    game_controller.start_game()
+    return game, game_controller
+
+
+def test_hash_does_not_depend_on_order_of_cards(game, player1, player2):
+    # arrange
+    player1.take_card(District.Temple)
+    player1.take_card(District.Palace)
+    player2.take_card(District.Palace)
+    player2.take_card(District.Temple)
+
+    # act
+    player1.remove_card(District.Temple)
+    player2.remove_card(District.Temple)
+
+    # assert
+    assert player1.hand == player2.hand
+    assert player1._hand_hash - player2._hand_hash == \
+        zobrist.hand_keys[player1.player_id][District.Palace.value] - \
+        zobrist.hand_keys[player2.player_id][District.Palace.value]
+
+
+def test_changes_are_undone_by_inverse_changes(game, player):
+    # arrange
+    game.crowned_player = player
+    before = game.zobrist
+
+    # act
+    player.take_card(District.Palace)
+    player.build_district(District.Temple)
+    player.cash_in(3)
+    player.char = Character.King
+    changed = game.zobrist
+    player.remove_card(District.Palace)
+    player.destroy_district(District.Temple)
+    player.withdraw(3)
+    player.char = None
+
+    # assert
+    assert changed != before
+    assert game.zobrist == before
+
+
+def test_deck_hash_tracks_composition(game):
+    # arrange
+    before = game.districts.zobrist
+
+    # act
+    district = game.districts.take_from_top()
+    taken = game.districts.zobrist
+    game.districts.put_on_bottom(district)
+
+    # assert
+    assert taken != before
+    assert game.districts.zobrist == before
+
+
+def test_facedown_discard_changes_hash(game, player1, player2):
+    # arrange
+    game.new_turn()
+    other = game.clone()
+
+    # act
+    game.characters.take(Character.Bishop)
+    game.turn.drop_char(facedown_char)
+    other.characters.take(Character.Merchant)
+    other.turn.drop_char(facedown_char)
+
+    # assert
+    assert game.turn.unused_chars == other.turn.unused_chars
+    assert game.zobrist != other.zobrist
+    game.characters.put_on_bottom(Character.Bishop)
+    game.characters.take(Character.Merchant)
+    assert game.zobrist == other.zobrist
+
+
+def test_clone_hashes_equally(game, player):
+    # arrange
+    player.take_card(District.Palace)
+    player.cash_in(2)
+
+    # act
+    clone = game.clone()
+
+    # assert
+    assert clone.zobrist == game.zobrist
+
+
+def test_rollback_restores_hash():
+    # arrange
+    game, game_controller = play_game(seed=5)
+    game.enable_journal()
+    marks = []
+    hashes = []
+
+    # act
+    for _ in range(3):
+        marks.append(game.mark())
+        hashes.append(game.zobrist)
+        game_controller.start_turn()
+        game_controller.take_turns()
+        game_controller.end_turn()
+
+    # assert
+    assert len(set(hashes)) == len(hashes)
+    for mark, expected in reversed(list(zip(marks, hashes))):
+        game.rollback(mark)
+        assert game.zobrist == expected
+
+
+def test_information_set_hides_opponents_hand(game, player1, player2):
+    # arrange
+    player1.take_card(District.Palace)
+    player2.take_card(District.Temple)
+    other = game.clone()
+    other.players[1].remove_card(District.Temple)
+    other.players[1].take_card(District.Castle)
+
+    # act
+    mine = ShadowGame(player1, game).zobrist
+    mine_in_other = ShadowGame(other.players[0], other).zobrist
+    theirs = ShadowGame(player2, game).zobrist
+    theirs_in_other = ShadowGame(other.players[1], other).zobrist
+
+    # assert
+    assert game.zobrist != other.zobrist
+    assert mine == mine_in_other
+    assert theirs != theirs_in_other